@@ -1,36 +1,37 @@
 import streamlit as st
-from pathlib import Path
-from PIL import Image
 
-from ui.layout import render_form
-from ui.pdf_export import save_form_as_pdf
+from ui.assets import registry
+from ui.company import render_company_picker
+from ui.drafts import render_draft_controls, restore_draft
+from ui.layout import equipment_summary, render_form
+from ui.pdf_export import form_from_session, render_bulk_export, render_timing_panel, save_form_as_pdf
 from ui.passwords import render_passwords_form
+from ui.returns import render_returns
 
 
 st.set_page_config(layout="wide", page_title="Equipment Issue Form")
 
 # ----------------------
-# Load CSS
+# Restore an autosaved draft (before any widget)
 # ----------------------
-css_path = Path(__file__).parent / "ui" / "styles.css"
-if css_path.exists():
-    st.markdown(f"<style>{css_path.read_text(encoding='utf-8')}</style>", unsafe_allow_html=True)
+restore_draft()
 
 # ----------------------
-# Layout
+# Load CSS
 # ----------------------
-col_left, col_right = st.columns([1, 3])
+css = registry.css()
+if css:
+    st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 
 # ----------------------
-# Left: checklist + export
+# Checklist
 # ----------------------
-with col_left:
+def render_checklist():
     st.markdown("## Checklist")
 
-    equipment_filled = any(
-        st.session_state.get(f"eq_desc_{i}", "").strip() != ""
-        for i in range(10)
-    )
+    # the equipment fragment compares against this to decide whether the page needs a full rerun
+    equipment_filled, first_asset = equipment_summary(form_from_session())
+    st.session_state["_equipment_summary_shown"] = (equipment_filled, first_asset)
 
     checklist_items = {
         "NAME": st.session_state.get("name", "").strip() != "",
@@ -44,48 +45,38 @@ with col_left:
     for label, completed in checklist_items.items():
         st.markdown(f"✅ {label}" if completed else f"❗ {label}")
 
+
+# ----------------------
+# Layout
+# ----------------------
+col_left, col_right = st.columns([1, 3])
+
+# ----------------------
+# Left: checklist + export
+# ----------------------
+with col_left:
+    render_checklist()
+
     st.markdown("---")
     save_form_as_pdf()
+    render_draft_controls()
+    render_timing_panel()
+    render_bulk_export()
+    render_returns()
 
 # ----------------------
 # Right: logo + form
 # ----------------------
 with col_right:
-    PROJECT_ROOT = Path(__file__).parent
-    logos_path = PROJECT_ROOT / "assets" / "logos"
-
-    if logos_path.exists() and logos_path.is_dir():
-        logo_files = sorted(
-            [f.name for f in logos_path.iterdir() if f.suffix.lower() == ".png"]
-        )
-
-        if logo_files:
-            default_idx = (
-                logo_files.index("demoforce_logo.png")
-                if "demoforce_logo.png" in logo_files
-                else 0
-            )
-
-            selected_logo = st.selectbox(
-                "Select Company Logo",
-                logo_files,
-                index=default_idx,
-                key="selected_logo",
-            )
-
-            # THIS MUST BE AT THIS INDENT LEVEL
-            st.session_state["selected_logo_path"] = str(
-                (logos_path / selected_logo).resolve()
-            )
-
-            # Preview logo
-            try:
-                logo_img = Image.open(st.session_state["selected_logo_path"])
-                if logo_img.mode in ("RGBA", "P"):
-                    logo_img = logo_img.convert("RGB")
-                st.image(logo_img, width=200)
-            except Exception as e:
-                st.error(f"Failed to load logo '{selected_logo}': {e}")
+    company = render_company_picker()
+
+    # Preview logo (thumbnail precomputed by the asset registry)
+    if company is not None and company.logo:
+        try:
+            st.session_state["selected_logo_path"] = company.logo_path
+            st.image(registry.logo(company.logo).thumbnail, width=200)
+        except Exception as e:
+            st.error(f"Failed to load logo '{company.logo}': {e}")
 
     render_form()
     st.markdown("---")
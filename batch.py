@@ -0,0 +1,145 @@
+"""
+Render equipment issue PDFs in bulk from a CSV or JSONL file.
+
+See pdf/bulk.py for the record format (the Streamlit form's flat session keys,
+or nested equipment lists in JSONL).
+
+    python batch.py starters.csv -o out/
+    python batch.py starters.jsonl -o out/ --logo statom_logo.png --workers 8
+    python batch.py starters.csv --zip starters.zip --size archive
+    python batch.py starters.csv -o out/ --directory users.csv
+
+Usernames and M365 addresses a record leaves blank are generated from its
+name, unique across the file and against the directory export.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+
+from pdf.bulk import format_for, iter_forms, write_zip
+from pdf.generator import PROFILES, render_equipment_issue_pdf, render_pdf
+from pdf.model import EquipmentIssueForm, unique_filename
+from pdf.usernames import DEFAULT_DIRECTORY_PATH, get_directory
+
+
+# ---------- worker ----------
+def _render_one(form: EquipmentIssueForm, out_path: str, size: str) -> int:
+    # output is deterministic, so an unchanged form leaves its existing file untouched
+    rendered = render_pdf(form, size=size)
+    try:
+        with open(out_path, "rb") as f:
+            if hashlib.sha256(f.read()).hexdigest() == rendered.sha256:
+                return len(rendered.data)
+    except FileNotFoundError:
+        pass
+    with open(out_path, "wb") as f:
+        f.write(rendered.data)
+    return len(rendered.data)
+
+
+# ---------- main ----------
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Render equipment issue PDFs from a CSV or JSONL file.")
+    ap.add_argument("input", type=Path, help="CSV or JSONL file, one starter per record")
+    ap.add_argument("-o", "--out", type=Path, default=Path("out"), help="output directory (default: out)")
+    ap.add_argument("--logo", default="demoforce_logo.png", help="default logo file in assets/logos")
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    ap.add_argument("-q", "--quiet", action="store_true", help="only print errors and the summary")
+    ap.add_argument("--zip", type=Path, help="write a single ZIP archive instead of one file per form")
+    ap.add_argument(
+        "--size", choices=tuple(PROFILES), default="print",
+        help="output profile: print (full-resolution logo) or archive (smaller files; default: print)",
+    )
+    ap.add_argument(
+        "--directory", type=Path, default=DEFAULT_DIRECTORY_PATH,
+        help="directory export CSV whose usernames are already taken (default: data/directory.csv, if present)",
+    )
+    args = ap.parse_args(argv)
+
+    if args.directory != DEFAULT_DIRECTORY_PATH and not args.directory.exists():
+        ap.error(f"directory export not found: {args.directory}")
+    directory = get_directory(args.directory)
+
+    failures = []
+    jobs = []
+    used_names = set()
+
+    try:
+        with args.input.open(encoding="utf-8-sig", newline="") as fp:
+            for line_no, form in iter_forms(fp, format_for(args.input.name), args.logo, directory):
+                if isinstance(form, Exception):
+                    failures.append((line_no, f"{type(form).__name__}: {form}"))
+                    continue
+                jobs.append((line_no, form, unique_filename(form.export_filename(), used_names)))
+    except ValueError as e:
+        print(f"{args.input}: {e}", file=sys.stderr)
+        return 1
+
+    if args.zip:
+        return _main_zip(args, jobs, failures)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+
+    total = len(jobs) + len(failures)
+    done = 0
+    rendered = 0
+    total_bytes = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            pool.submit(_render_one, form, str(args.out / filename), args.size): (line_no, filename)
+            for line_no, form, filename in jobs
+        }
+        for fut in as_completed(futures):
+            line_no, filename = futures[fut]
+            done += 1
+            try:
+                total_bytes += fut.result()
+                rendered += 1
+            except Exception as e:
+                failures.append((line_no, f"{type(e).__name__}: {e}"))
+                print(f"[{done}/{len(jobs)}] FAILED line {line_no}: {e}", file=sys.stderr)
+                continue
+            if not args.quiet:
+                print(f"[{done}/{len(jobs)}] {filename}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+
+    for line_no, err in sorted(failures):
+        print(f"line {line_no}: {err}", file=sys.stderr)
+
+    rate = rendered / elapsed if elapsed > 0 else 0.0
+    print(
+        f"{rendered}/{total} forms rendered in {elapsed:.2f}s "
+        f"({rate:.1f} forms/sec, {args.workers} workers, {total_bytes / 1024:.0f} KiB) -> {args.out}"
+    )
+    return 1 if failures else 0
+
+
+def _main_zip(args, jobs, failures) -> int:
+    # Rendering is sequential here: the archive is written one PDF at a time to keep memory flat.
+    started = time.perf_counter()
+    render = partial(render_equipment_issue_pdf, size=args.size, invariant=True)
+    with args.zip.open("wb") as out:
+        written, errors = write_zip((form for _, form, _ in jobs), out, render=render)
+    elapsed = time.perf_counter() - started
+
+    for i, err in errors:
+        failures.append((jobs[i][0], err))
+    for line_no, err in sorted(failures):
+        print(f"line {line_no}: {err}", file=sys.stderr)
+
+    total = len(jobs) + len(failures) - len(errors)
+    rate = len(written) / elapsed if elapsed > 0 else 0.0
+    print(f"{len(written)}/{total} forms zipped in {elapsed:.2f}s ({rate:.1f} forms/sec) -> {args.zip}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Load test for the HTTP render service (server.py), entirely on localhost.
+
+    python -m bench.http_load                        # starts a server on a free port, 8 clients x 25 requests
+    python -m bench.http_load --clients 32 --requests 50 --workers 4
+    python -m bench.http_load --url http://127.0.0.1:8502   # against an already running server
+
+Each client holds one keep-alive connection and posts the same filled-in form
+(with a per-request name, so nothing is served from a cache).
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from bench.run import _percentile, sample_state
+
+
+def _payload(i: int) -> bytes:
+    state = sample_state()
+    state["date"] = state["date"].isoformat()
+    state["name"] = f"Load Test {i}"
+    return json.dumps(state).encode("utf-8")
+
+
+def _client(host, port, path, n, offset, latencies, statuses, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    for i in range(n):
+        body = _payload(offset + i)
+        started = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            status = resp.status
+        except (OSError, http.client.HTTPException) as e:
+            status = type(e).__name__
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+    conn.close()
+
+
+def run(url: str, clients: int, requests: int, size: str) -> dict:
+    parts = urlsplit(url)
+    path = "/render" + (f"?size={size}" if size != "print" else "")
+    latencies, statuses, lock = [], {}, threading.Lock()
+
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(parts.hostname, parts.port, path, requests, c * requests, latencies, statuses, lock),
+        )
+        for c in range(clients)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Load test the HTTP render service on localhost.")
+    ap.add_argument("--url", help="running server to test (default: start one on a free port)")
+    ap.add_argument("--clients", type=int, default=8, help="concurrent keep-alive connections (default: 8)")
+    ap.add_argument("--requests", type=int, default=25, help="requests per client (default: 25)")
+    ap.add_argument("--workers", type=int, default=2, help="render processes for the spawned server (default: 2)")
+    ap.add_argument("--size", default="print", choices=("print", "archive"))
+    args = ap.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        from server import RenderServer
+
+        server = RenderServer(("127.0.0.1", 0), args.workers, "demoforce_logo.png")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        result = run(url, args.clients, args.requests, args.size)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(json.dumps(result, indent=2))
+    return 0 if set(result["statuses"]) == {"200"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Import-time budget for the app's cold start.
+
+    python -m bench.importtime                  # exit 1 if over budget
+    python -m bench.importtime --budget-ms 80 --runs 7 -v
+
+Runs `python -X importtime` on app.py's own top-level imports, in fresh
+interpreters, after `import streamlit`. The framework is a fixed cost; this
+measures only what the app adds on top of it. Fails when:
+
+  * the median cumulative import time is over --budget-ms, or
+  * a module that's only needed to build a PDF (reportlab, PIL, pypdf, pandas)
+    gets imported at startup; those belong behind a function-level import.
+"""
+import argparse
+import ast
+import statistics
+import subprocess
+import sys
+
+from bench.run import PROJECT_ROOT
+
+ENTRY_POINT = PROJECT_ROOT / "app.py"
+DEFAULT_BUDGET_MS = 120.0
+DEFERRED_PACKAGES = ("reportlab", "PIL", "pypdf", "pandas")
+
+
+def entry_imports(path=ENTRY_POINT) -> list:
+    """app.py's module-level import statements, as source lines (streamlit itself left out)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    lines = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            names = [node.module or ""]
+        else:
+            continue
+        if all(n.split(".")[0] == "streamlit" for n in names):
+            continue
+        lines.append(ast.unparse(node))
+    return lines
+
+
+def _parse(stderr: str) -> list:
+    """(module, self us, cumulative us, depth) for every import after streamlit's."""
+    rows, started = [], False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if not started:
+            started = depth == 0 and name == "streamlit"
+            continue
+        rows.append((name, int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure_once(imports: list) -> list:
+    code = "\n".join(["import streamlit"] + imports)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing app.py's modules failed:\n{proc.stderr[-2000:]}")
+    return _parse(proc.stderr)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Check app.py's import time against a budget.")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                    help=f"allowed median import time on top of streamlit (default: {DEFAULT_BUDGET_MS:g})")
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters to measure (default: 5)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="list the app's top-level imports")
+    args = ap.parse_args(argv)
+
+    imports = entry_imports()
+    measure_once(imports)  # first run compiles any stale .pyc; not counted
+
+    totals, runs = [], []
+    for _ in range(max(1, args.runs)):
+        rows = measure_once(imports)
+        runs.append(rows)
+        totals.append(sum(cum for _, _, cum, depth in rows if depth == 0) / 1000)
+    median = statistics.median(totals)
+
+    rows = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    if args.verbose:
+        for name, _, cum, depth in rows:
+            if depth == 0:
+                print(f"{cum / 1000:>9.1f} ms  {name}")
+
+    deferred = sorted({name.split(".")[0] for name, _, _, _ in rows} & set(DEFERRED_PACKAGES))
+    print(f"app.py imports: {median:.1f} ms median of {len(totals)} (budget {args.budget_ms:g} ms)")
+
+    failed = False
+    if median > args.budget_ms:
+        print(f"OVER BUDGET by {median - args.budget_ms:.1f} ms")
+        failed = True
+    if deferred:
+        print("imported at startup but only needed to build a PDF: " + ", ".join(deferred))
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Local, offline benchmarks for PDF generation and full app reruns.
+
+    python -m bench.run                         # everything, results -> bench_results.json
+    python -m bench.run --only pdf --repeat 50
+    python -m bench.run --compare old.json      # exit 1 if any p50 regressed past --threshold
+
+Scenarios:
+  pdf.cold.<logo>         first build after clearing the logo + skeleton caches
+  pdf.warm.<logo>         repeated builds with warm caches
+  pdf.archive.<logo>      warm builds with size="archive" (size reduction vs print is reported)
+  pdf.extra.<n>           warm builds with n extra-account rows
+  app.rerun.extra.<n>     full app.py rerun through streamlit's AppTest,
+                          10 equipment rows + 8 returned rows filled in
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from pdf import assets, generator, text  # noqa: E402
+from pdf.model import EQ_ROWS, RET_ROWS, EquipmentIssueForm  # noqa: E402
+
+LOGOS_DIR = PROJECT_ROOT / "assets" / "logos"
+EXTRA_COUNTS = (0, 5, 20, 40)
+
+
+# ---------- fixtures ----------
+def sample_state(extra_accounts: int = 3, logo: str = "demoforce_logo.png") -> dict:
+    """A fully filled-in form in session-state shape."""
+    state = {
+        "name": "Jack Smith",
+        "date": date(2024, 3, 1),
+        "work_location": "Roaming",
+        "issuer_name": "Alex Issuer",
+        "receiver_name": "Jack Smith",
+        "return_issuer": "Alex Issuer",
+        "return_receiver": "Jack Smith",
+        "starter_full_name": "Jack Smith",
+        "starter_role": "Site Engineer",
+        "starter_instructions": 'Please download the "Microsoft Authenticator App" from your Play Store or App Store',
+        "laptop_username": "jack.smith",
+        "laptop_password": "Laptop-Pass-1",
+        "m365_user_base": "jack.smith",
+        "m365_domain": "statom.co.uk",
+        "m365_password": "M365-Pass-1",
+        "m365_2fa": True,
+        "sharepoint_url": "https://statom.sharepoint.com",
+        "helpdesk_email": "helpdesk@statom.co.uk",
+        "extra_accounts": [
+            {"Software": f"Software {i}", "Account": f"jack.smith{i}", "Password": f"pw-{i}"}
+            for i in range(extra_accounts)
+        ],
+        "selected_logo": logo,
+    }
+    for i in range(EQ_ROWS):
+        state[f"eq_desc_{i}"] = f"Dell Latitude 5540 #{i}"
+        state[f"eq_condition_{i}"] = "New"
+        state[f"eq_serial_{i}"] = f"SN{1000 + i}"
+        state[f"eq_asset_{i}"] = f"AST-{2000 + i}"
+    for i in range(RET_ROWS):
+        state[f"ret_desc_{i}"] = f"iPhone 12 #{i}"
+        state[f"ret_condition_{i}"] = "Scratched"
+        state[f"ret_serial_{i}"] = f"RS{3000 + i}"
+        state[f"ret_asset_{i}"] = f"AST-{4000 + i}"
+    return state
+
+
+def sample_form(extra_accounts: int = 3, logo: str = "demoforce_logo.png") -> EquipmentIssueForm:
+    state = sample_state(extra_accounts, logo)
+    return EquipmentIssueForm.from_state(state, logo_path=str(LOGOS_DIR / logo))
+
+
+def clear_caches():
+    with assets._logo_lock:
+        assets._logo_cache.clear()
+        assets._fitted_cache.clear()
+    with generator._skeleton_lock:
+        generator._skeleton_ops.clear()
+    for fn in (text.glyph_width, text.text_width, text.wrap):
+        fn.cache_clear()
+
+
+# ---------- measurement ----------
+def _percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def measure(fn, repeat: int, setup=None) -> dict:
+    """
+    Time `repeat` calls of fn() (setup() runs untimed before each call),
+    then one extra traced call for peak Python memory.
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    out = {
+        "n": len(times),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "p50_ms": round(_percentile(times, 50), 3),
+        "p95_ms": round(_percentile(times, 95), 3),
+        "p99_ms": round(_percentile(times, 99), 3),
+        "max_ms": round(times[-1], 3),
+        "peak_mem_kib": round(peak / 1024, 1),
+    }
+    if isinstance(result, (bytes, bytearray)):
+        out["output_bytes"] = len(result)
+    return out
+
+
+# ---------- scenarios ----------
+def bench_pdf(repeat: int) -> dict:
+    results = {}
+    logos = sorted(p.name for p in LOGOS_DIR.glob("*.png"))
+
+    for logo in logos:
+        form = sample_form(logo=logo)
+        results[f"pdf.cold.{logo}"] = measure(
+            lambda: generator.render_equipment_issue_pdf(form), max(3, repeat // 5), setup=clear_caches
+        )
+        generator.render_equipment_issue_pdf(form)
+        results[f"pdf.warm.{logo}"] = measure(lambda: generator.render_equipment_issue_pdf(form), repeat)
+        results[f"pdf.archive.{logo}"] = measure(
+            lambda: generator.render_equipment_issue_pdf(form, size="archive"), repeat
+        )
+
+    for n in EXTRA_COUNTS:
+        form = sample_form(extra_accounts=n)
+        generator.render_equipment_issue_pdf(form)
+        results[f"pdf.extra.{n}"] = measure(lambda: generator.render_equipment_issue_pdf(form), repeat)
+
+    return results
+
+
+def bench_app(repeat: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    # seeding session state outside a script run warns once per key
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+    # autosaved drafts and the export store go to a scratch dir, not the repo's data/
+    # (both paths are read when app.py first imports pdf.drafts / pdf.store)
+    with tempfile.TemporaryDirectory(prefix="equipment-bench-", ignore_cleanup_errors=True) as scratch:
+        os.environ.setdefault("EQUIPMENT_DRAFTS", str(Path(scratch) / "drafts"))
+        os.environ.setdefault("EQUIPMENT_FORM_DB", str(Path(scratch) / "forms.sqlite3"))
+
+        results = {}
+        for n in EXTRA_COUNTS:
+            at = AppTest.from_file(str(PROJECT_ROOT / "app.py"), default_timeout=60)
+            for k, v in sample_state(extra_accounts=n).items():
+                at.session_state[k] = v
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"app.py raised during benchmark: {at.exception}")
+
+            results[f"app.rerun.extra.{n}"] = measure(at.run, repeat)
+    return results
+
+
+# ---------- reporting ----------
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Return scenarios whose p50 grew by more than `threshold`x over the baseline."""
+    regressions = []
+    for name, cur in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old or not old.get("p50_ms"):
+            continue
+        ratio = cur["p50_ms"] / old["p50_ms"]
+        if ratio > threshold:
+            regressions.append((name, old["p50_ms"], cur["p50_ms"], ratio))
+    return regressions
+
+
+def _print_table(results: dict):
+    print(f"{'scenario':36} {'p50':>9} {'p95':>9} {'p99':>9} {'peak KiB':>10} {'bytes':>9}")
+    for name, r in results.items():
+        print(
+            f"{name:36} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{r['peak_mem_kib']:>10.1f} {r.get('output_bytes', ''):>9}"
+        )
+
+
+def _print_sizes(results: dict):
+    # print vs archive output size for every logo benchmarked
+    logos = [name[len("pdf.archive."):] for name in results if name.startswith("pdf.archive.")]
+    if not logos:
+        return
+    print(f"\n{'logo':36} {'print':>9} {'archive':>9} {'saved':>7}")
+    for logo in logos:
+        full = results[f"pdf.warm.{logo}"]["output_bytes"]
+        small = results[f"pdf.archive.{logo}"]["output_bytes"]
+        print(f"{logo:36} {full:>9} {small:>9} {1 - small / full:>7.1%}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark PDF generation and app reruns.")
+    ap.add_argument("--only", choices=("pdf", "app"), help="run one group of scenarios")
+    ap.add_argument("--repeat", type=int, default=30, help="timed iterations per scenario (default: 30)")
+    ap.add_argument("--out", type=Path, default=Path("bench_results.json"), help="JSON results file")
+    ap.add_argument("--compare", type=Path, help="previous results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25, help="allowed p50 slowdown ratio (default: 1.25)")
+    args = ap.parse_args(argv)
+
+    results = {}
+    if args.only in (None, "pdf"):
+        results.update(bench_pdf(args.repeat))
+    if args.only in (None, "app"):
+        results.update(bench_app(max(3, args.repeat // 3)))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    _print_table(results)
+    _print_sizes(results)
+    print(f"\nresults -> {args.out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESSION {name}: p50 {old:.2f}ms -> {new:.2f}ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Concurrent-session load test for app.py, entirely in-process.
+
+    python -m bench.sessions                          # 1, 2, 4 and 8 sessions, 20 edits each
+    python -m bench.sessions --sessions 1 8 16 --edits 40 --out sessions.json
+
+Each simulated session is a streamlit AppTest seeded with a fully filled-in
+form (its own name, so every session has its own PDF), as one office
+manager's browser tab. All sessions share this process and its caches and
+render pool, the way they share one `streamlit run` server. Per level N:
+
+  memory      Python heap allocated while the N sessions were created and their
+              first PDFs rendered (tracemalloc), per session; plus process RSS growth
+  latency     every session edits one equipment field and reruns, `--edits`
+              times, all N at once; p50/p95/p99 per rerun and reruns/s overall
+
+AppTest swaps a process-global runtime for the duration of each run, so runs
+from different sessions take turns on a lock. Latency is measured from the
+edit to the finished rerun, including that wait. A real server interleaves
+CPU-bound reruns under the GIL, so the total work is the same.
+
+Drafts and the forms database go to a temporary directory.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from bench.run import PROJECT_ROOT, _percentile, sample_state
+from pdf.model import EQ_ROWS
+
+SESSION_COUNTS = (1, 2, 4, 8)
+
+_run_lock = threading.Lock()    # one AppTest run at a time (see above)
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        # no /proc: peak RSS is the best available (KiB on Linux, bytes on macOS)
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _new_session(s: int, extra_accounts: int):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(PROJECT_ROOT / "app.py"), default_timeout=120)
+    state = sample_state(extra_accounts=extra_accounts)
+    state["name"] = state["receiver_name"] = f"Load Test {s}"
+    for k, v in state.items():
+        at.session_state[k] = v
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"app.py raised in session {s}: {at.exception}")
+    # wait for the session's background render, so its PDF counts towards its memory
+    at.session_state["_live_form"].pdf_bytes()
+    return at
+
+
+def _drive(at, s: int, edits: int, latencies: list, errors: list, lock):
+    for j in range(edits):
+        started = time.perf_counter()
+        with _run_lock:
+            at.text_input(key=f"eq_desc_{j % EQ_ROWS}").input(f"Laptop {s}.{j}").run()
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if at.exception:
+                errors.append(f"session {s}: {at.exception}")
+
+
+def run_level(n: int, edits: int, extra_accounts: int) -> dict:
+    from ui import pdf_export
+
+    # start each level from empty shared caches, so memory isn't borrowed from the previous one
+    with pdf_export._pdf_cache_lock:
+        pdf_export._pdf_cache.clear()
+    gc.collect()
+    rss_before = _rss_bytes()
+
+    tracemalloc.start()
+    sessions = [_new_session(s, extra_accounts) for s in range(n)]
+    gc.collect()
+    heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _rss_bytes()
+
+    latencies, errors, lock = [], [], threading.Lock()
+    threads = [
+        threading.Thread(target=_drive, args=(at, s, edits, latencies, errors, lock))
+        for s, at in enumerate(sessions)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "sessions": n,
+        "reruns": len(latencies),
+        "seconds": round(elapsed, 3),
+        "reruns_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "heap_per_session_kib": round(heap / n / 1024, 1),
+        "rss_growth_per_session_kib": round(max(0, rss_after - rss_before) / n / 1024, 1),
+        "rss_mib": round(_rss_bytes() / 2**20, 1),
+        "errors": errors[:5],
+    }
+    del sessions, threads
+    return result
+
+
+def _print_table(results: list):
+    print(
+        f"{'sessions':>8} {'reruns/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} "
+        f"{'heap KiB/s':>11} {'RSS KiB/s':>10} {'RSS MiB':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['sessions']:>8} {r['reruns_per_s']:>9.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{r['heap_per_session_kib']:>11.1f} {r['rss_growth_per_session_kib']:>10.1f} {r['rss_mib']:>8.1f}"
+        )
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Load test app.py with N concurrent simulated sessions.")
+    ap.add_argument("--sessions", type=int, nargs="+", default=list(SESSION_COUNTS), help="session counts to run")
+    ap.add_argument("--edits", type=int, default=20, help="edit + rerun cycles per session (default: 20)")
+    ap.add_argument("--extra-accounts", type=int, default=3, help="extra-account rows per form (default: 3)")
+    ap.add_argument("--out", type=Path, help="also write the results as JSON")
+    args = ap.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix="equipment-sessions-")
+    os.environ.setdefault("EQUIPMENT_DRAFTS", str(Path(scratch) / "drafts"))
+    os.environ.setdefault("EQUIPMENT_FORM_DB", str(Path(scratch) / "forms.sqlite3"))
+
+    # AppTest sessions seeded outside a script run warn once per key
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    # one throwaway session first: imports, asset registry and font setup aren't per-session costs
+    _new_session(-1, args.extra_accounts)
+
+    results = [run_level(n, args.edits, args.extra_accounts) for n in args.sessions]
+
+    _print_table(results)
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nresults -> {args.out}")
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import threading
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL import Image
+    from reportlab.lib.utils import ImageReader
+
+# PIL and reportlab are imported on first decode, not at import: the app only
+# needs LOGOS_DIR until a logo is shown or a PDF is built.
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+LOGOS_DIR = PROJECT_ROOT / "assets" / "logos"
+
+
+@dataclass(frozen=True)
+class LogoAsset:
+    path: str
+    mtime_ns: int
+    image: "Image.Image"   # decoded RGB image (UI preview)
+    reader: "ImageReader"  # ready-to-draw image for reportlab
+
+
+# resolved path -> LogoAsset (one entry per file, replaced when the mtime changes)
+_logo_cache = {}
+# (resolved path, mtime_ns, width px, height px) -> ImageReader of a downsampled copy
+_fitted_cache = {}
+_logo_lock = threading.Lock()
+
+
+def _decode_logo(path: str, mtime_ns: int) -> LogoAsset:
+    """
+    PIL open -> convert to RGB -> PNG in BytesIO -> ImageReader.
+    Done once per file version; the reader's pixel data is primed so
+    reportlab hashes the same bytes for every page and embeds the image once.
+    """
+    from PIL import Image
+    from reportlab.lib.utils import ImageReader
+
+    pil_img = Image.open(path)
+    if pil_img.mode in ("RGBA", "LA", "P"):
+        pil_img = pil_img.convert("RGB")
+    pil_img.load()
+
+    tmp = BytesIO()
+    pil_img.save(tmp, format="PNG")
+    tmp.seek(0)
+
+    reader = ImageReader(tmp)
+    reader.getRGBData()
+    return LogoAsset(path=path, mtime_ns=mtime_ns, image=pil_img, reader=reader)
+
+
+def get_logo(path) -> LogoAsset:
+    """
+    Return the decoded logo for `path`, decoding it at most once per process
+    (or again if the file changed on disk). Raises OSError if it can't be read.
+    """
+    path = str(Path(path).resolve())
+    mtime_ns = Path(path).stat().st_mtime_ns
+
+    with _logo_lock:
+        asset = _logo_cache.get(path)
+        if asset is not None and asset.mtime_ns == mtime_ns:
+            return asset
+
+        asset = _decode_logo(path, mtime_ns)
+        _logo_cache[path] = asset
+        return asset
+
+
+def fitted_logo(path, box_w: float, box_h: float, dpi: int) -> "ImageReader":
+    """
+    The logo resampled to the pixels a `box_w` x `box_h` pt box needs at `dpi`
+    (aspect ratio kept). Logos already at or below that size are returned as is.
+    One reader per logo version and size, so every page shares one embedded image.
+    """
+    asset = get_logo(path)
+    img = asset.image
+    scale = min(box_w * dpi / 72 / img.width, box_h * dpi / 72 / img.height)
+    if scale >= 1:
+        return asset.reader
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+
+    key = (asset.path, asset.mtime_ns) + size
+    with _logo_lock:
+        reader = _fitted_cache.get(key)
+        if reader is None:
+            from PIL import Image
+            from reportlab.lib.utils import ImageReader
+
+            # drop stale versions of this logo
+            for k in [k for k in _fitted_cache if k[0] == asset.path]:
+                del _fitted_cache[k]
+            tmp = BytesIO()
+            img.resize(size, Image.LANCZOS).save(tmp, format="PNG")
+            tmp.seek(0)
+            reader = ImageReader(tmp)
+            reader.getRGBData()
+            _fitted_cache[key] = reader
+        return reader
@@ -0,0 +1,172 @@
+"""
+Bulk input and output for many equipment issue forms.
+
+Records use the same flat keys as the Streamlit form
+(name, date, work_location, eq_desc_0, eq_asset_0, ret_serial_0, laptop_username, ...).
+JSON records may instead give `equipment` / `returned_equipment` as lists of
+{"DESCRIPTION", "CONDITION AT ISSUE" / "RETURNED CONDITION", "SERIAL No", "ASSET No"} dicts,
+and `extra_accounts` as a list of {"Software", "Account", "Password"} dicts
+(in CSV, `extra_accounts` is a JSON string). `logo` / `selected_logo` picks a file in assets/logos.
+`company` names a profile in assets/companies.json, which fills in the logo, M365 domain,
+SharePoint URL and helpdesk email the record leaves blank. Usernames and the
+M365 address a record leaves blank are generated from its name for the whole
+file at once (pdf/usernames.py), unique within the file and against the
+directory export.
+"""
+import csv
+import json
+import zipfile
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from pdf.assets import LOGOS_DIR
+from pdf.companies import apply_company
+from pdf.generator import render_equipment_issue_pdf
+from pdf.model import EquipmentIssueForm, unique_filename
+from pdf.usernames import Directory, assign_accounts
+
+_EQ_FIELDS = (("desc", "DESCRIPTION"), ("condition", "CONDITION AT ISSUE"), ("serial", "SERIAL No"), ("asset", "ASSET No"))
+_RET_FIELDS = (("desc", "DESCRIPTION"), ("condition", "RETURNED CONDITION"), ("serial", "SERIAL No"), ("asset", "ASSET No"))
+
+
+# ---------- input ----------
+def read_records(fp: IO[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line_no, dict) pairs from an open text stream; fmt is "csv" or "jsonl".
+    A malformed JSON line yields (line_no, exception) instead of stopping the read.
+    Raises ValueError when the file isn't UTF-8 text.
+    """
+    try:
+        yield from _read_records(fp, fmt)
+    except UnicodeDecodeError:
+        raise ValueError("file is not UTF-8 text; save it as UTF-8 (in Excel: CSV UTF-8)") from None
+
+
+def _read_records(fp: IO[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    if fmt == "jsonl":
+        for n, line in enumerate(fp, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield n, json.loads(line)
+            except ValueError as e:
+                yield n, e
+    else:
+        # line 1 is the header
+        for n, row in enumerate(csv.DictReader(fp), start=2):
+            yield n, row
+
+
+def format_for(filename: str) -> str:
+    return "jsonl" if Path(filename).suffix.lower() in (".jsonl", ".ndjson") else "csv"
+
+
+def _rows(key: str, value) -> List[dict]:
+    """A nested list of objects from a record (None / null entries are blank rows); ValueError otherwise."""
+    if value is None or value == "":
+        return []
+    if not isinstance(value, list) or not all(r is None or isinstance(r, dict) for r in value):
+        raise ValueError(f"{key} must be a list of objects")
+    return [r or {} for r in value]
+
+
+def _flatten(record: dict) -> dict:
+    """Expand nested equipment lists into the flat eq_* / ret_* keys the form uses."""
+    state = dict(record)
+
+    for list_key, prefix, fields in (
+        ("equipment", "eq", _EQ_FIELDS),
+        ("returned_equipment", "ret", _RET_FIELDS),
+    ):
+        rows = _rows(list_key, state.pop(list_key, None))
+        for i, r in enumerate(rows):
+            for short, label in fields:
+                state.setdefault(f"{prefix}_{short}_{i}", r.get(label, ""))
+
+    extra = state.get("extra_accounts")
+    if isinstance(extra, str):
+        try:
+            extra = json.loads(extra) if extra.strip() else []
+        except json.JSONDecodeError as e:
+            raise ValueError(f"extra_accounts is not valid JSON: {e}") from None
+    if extra is not None:
+        state["extra_accounts"] = _rows("extra_accounts", extra)
+
+    if isinstance(state.get("m365_2fa"), str):
+        state["m365_2fa"] = state["m365_2fa"].strip().lower() in ("1", "true", "yes", "y")
+
+    return state
+
+
+def _logo_path(record: dict, default_logo: str) -> str:
+    name = (record.get("logo") or record.get("selected_logo") or default_logo or "").strip()
+    if not name:
+        return ""
+    candidate = LOGOS_DIR / name
+    if Path(name).name != name or LOGOS_DIR.resolve() not in candidate.resolve().parents:
+        raise ValueError(f"logo must be a file name in assets/logos: {name}")
+    if not candidate.exists():
+        raise FileNotFoundError(f"logo not found: {name}")
+    return str(candidate.resolve())
+
+
+def _to_form(merged: dict, default_logo: str) -> EquipmentIssueForm:
+    state = _flatten(merged)
+    return EquipmentIssueForm.from_state(state, logo_path=_logo_path(state, default_logo))
+
+
+def record_to_form(record: dict, default_logo: str = "") -> EquipmentIssueForm:
+    return _to_form(apply_company(record), default_logo)
+
+
+def iter_forms(fp: IO[str], fmt: str, default_logo: str = "", directory: Optional[Directory] = None) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line_no, EquipmentIssueForm) or (line_no, exception) for every record.
+    The file is read in full first: blank usernames are assigned across all of
+    its records in one pass, checked against `directory` (when given).
+    """
+    records = []
+    for line_no, record in read_records(fp, fmt):
+        if not isinstance(record, Exception):
+            try:
+                record = apply_company(record)   # the company decides the M365 domain
+            except Exception as e:
+                record = e
+        records.append((line_no, record))
+
+    assign_accounts([r for _, r in records if isinstance(r, dict)], directory)
+
+    for line_no, record in records:
+        if isinstance(record, Exception):
+            yield line_no, record
+            continue
+        try:
+            yield line_no, _to_form(record, default_logo)
+        except Exception as e:
+            yield line_no, e
+
+
+# ---------- ZIP output ----------
+def write_zip(forms: Iterable[EquipmentIssueForm], fileobj: IO[bytes], render=render_equipment_issue_pdf) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """
+    Render each form and stream it into a ZIP on `fileobj`, one PDF at a time,
+    so memory stays flat however many forms there are. Entries are named with
+    the "Name - Asset.pdf" export convention (suffixed on collisions).
+    Returns (written filenames, [(index, error)]); a failing form is skipped.
+    """
+    written, errors = [], []
+    used = set()
+
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for i, form in enumerate(forms):
+            try:
+                pdf_bytes = render(form)
+            except Exception as e:
+                errors.append((i, f"{type(e).__name__}: {e}"))
+                continue
+            filename = unique_filename(form.export_filename(), used)
+            zf.writestr(filename, pdf_bytes)
+            written.append(filename)
+
+    return written, errors
+
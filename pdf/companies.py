@@ -0,0 +1,192 @@
+"""
+Company profiles (logo, M365 domain, SharePoint, helpdesk) from assets/companies.json.
+
+    {"default": "statom",
+     "defaults": {"sharepoint_url": "...", "helpdesk_email": "..."},
+     "companies": [{"key": "statom", "name": "Statom Group", "logo": "statom_logo.png",
+                    "m365_domain": "statom.co.uk"}, ...]}
+
+Each profile is compiled once per config version into a CompanyBundle: the
+resolved logo path and the form defaults. Switching company, or rendering a
+batch across companies, is then a dict lookup. Compiling only checks that
+the logo exists. A missing logo is logged and dropped, and a broken entry
+is logged and skipped, so one bad entry doesn't fail every page.
+
+Companies.warm() decodes every logo and builds its header image for each
+output profile. It is for processes that render (the HTTP service's
+workers), not for the UI's cold start.
+
+The shipped config defaults to Statom, whose domain is also
+pdf.model.DEFAULT_M365_DOMAIN, the fallback for records without a company.
+"""
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Optional
+
+from pdf.assets import LOGOS_DIR, PROJECT_ROOT, fitted_logo, get_logo
+from pdf.model import DEFAULT_HELPDESK_EMAIL, DEFAULT_M365_DOMAIN, DEFAULT_SHAREPOINT_URL
+
+log = logging.getLogger("equipment_form.companies")
+
+DEFAULT_COMPANIES_PATH = Path(os.environ.get("EQUIPMENT_COMPANIES", PROJECT_ROOT / "assets" / "companies.json"))
+
+
+@dataclass(frozen=True)
+class CompanyBundle:
+    key: str
+    name: str
+    logo: str                       # file name in assets/logos ("" = no logo)
+    m365_domain: str
+    sharepoint_url: str
+    helpdesk_email: str
+    logo_path: str = ""             # resolved
+
+    def defaults(self) -> dict:
+        """Session-state / record keys this company fills in."""
+        return {
+            "selected_logo": self.logo,
+            "m365_domain": self.m365_domain,
+            "sharepoint_url": self.sharepoint_url,
+            "helpdesk_email": self.helpdesk_email,
+        }
+
+    def warm(self):
+        """Decode the logo and build its header image for each output profile (into the pdf.assets caches)."""
+        if not self.logo_path:
+            return
+        from pdf import coordinates as L
+        from pdf.generator import PROFILES
+
+        box_w, box_h = L.LOGO_BOX_W - 2 * L.LOGO_PAD, L.HEADER_H - 2 * L.LOGO_PAD
+        get_logo(self.logo_path)
+        for p in PROFILES.values():
+            if p.logo_dpi:
+                fitted_logo(self.logo_path, box_w, box_h, p.logo_dpi)
+
+
+def _text(value, fallback: str = "") -> str:
+    # config values may be numbers (or anything JSON allows); the form only deals in strings
+    text = str(value).strip() if value is not None else ""
+    return text or fallback
+
+
+def _compile(entry: dict, defaults: dict) -> CompanyBundle:
+    """One config entry -> bundle. Raises ValueError for an entry that can't be used at all."""
+    if not isinstance(entry, dict):
+        raise ValueError(f"company entry is not an object: {entry!r}")
+    key = _text(entry.get("key"))
+    if not key:
+        raise ValueError("company entry without a key")
+
+    fields = {**defaults, **entry}
+    bundle = CompanyBundle(
+        key=key,
+        name=_text(fields.get("name"), key),
+        logo=_text(fields.get("logo")),
+        m365_domain=_text(fields.get("m365_domain"), DEFAULT_M365_DOMAIN),
+        sharepoint_url=_text(fields.get("sharepoint_url"), DEFAULT_SHAREPOINT_URL),
+        helpdesk_email=_text(fields.get("helpdesk_email"), DEFAULT_HELPDESK_EMAIL),
+    )
+    if not bundle.logo:
+        return bundle
+
+    path = LOGOS_DIR / bundle.logo
+    if not path.exists():
+        # the company still works, just without a logo
+        log.error("company %r: logo not found: %s", key, bundle.logo)
+        return replace(bundle, logo="")
+    return replace(bundle, logo_path=str(path.resolve()))
+
+
+class Companies:
+    """All compiled bundles from one version of the config file, in file order."""
+
+    def __init__(self, bundles: Dict[str, CompanyBundle], default: str):
+        self.bundles = bundles
+        self.default = default if default in bundles else next(iter(bundles), "")
+
+    def __len__(self):
+        return len(self.bundles)
+
+    def keys(self):
+        return list(self.bundles)
+
+    def get(self, key: Optional[str]) -> Optional[CompanyBundle]:
+        return self.bundles.get(key or self.default)
+
+    def warm(self):
+        for bundle in self.bundles.values():
+            bundle.warm()
+
+    def domains(self) -> list:
+        """M365 domains, one per company, in config order."""
+        return list(dict.fromkeys(b.m365_domain for b in self.bundles.values()))
+
+
+def load_companies(path) -> Companies:
+    """
+    Compile a config file. Raises ValueError if it isn't a JSON object; a bad
+    entry is logged and left out, so one typo doesn't take every company with it.
+    """
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    defaults = raw.get("defaults")
+    defaults = defaults if isinstance(defaults, dict) else {}
+    bundles = {}
+    for entry in raw.get("companies") or []:
+        try:
+            bundle = _compile(entry, defaults)
+        except ValueError as e:
+            log.error("%s: skipping company: %s", path, e)
+            continue
+        bundles[bundle.key] = bundle
+    return Companies(bundles, _text(raw.get("default")))
+
+
+_companies = {}     # resolved path -> (mtime_ns, Companies)
+_companies_lock = threading.Lock()
+
+
+def get_companies(path=DEFAULT_COMPANIES_PATH) -> Companies:
+    """Process-wide compiled profiles, rebuilt when the config file changes; empty when it doesn't exist."""
+    path = Path(path)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return Companies({}, "")
+
+    key = str(path.resolve())
+    with _companies_lock:
+        cached = _companies.get(key)
+        if cached is None or cached[0] != mtime_ns:
+            try:
+                companies = load_companies(path)
+            except (OSError, ValueError):
+                # keep serving the last good version (or none) until the file is fixed
+                log.exception("can't load company profiles from %s", path)
+                companies = cached[1] if cached is not None else Companies({}, "")
+            cached = _companies[key] = (mtime_ns, companies)
+        return cached[1]
+
+
+def apply_company(record: dict, companies: Optional[Companies] = None) -> dict:
+    """
+    Fill a bulk / HTTP record's company-specific keys from its `company` profile.
+    Values the record sets itself win. Raises ValueError for an unknown company.
+    """
+    key = _text(record.get("company"))
+    if not key:
+        return record
+    bundle = (companies or get_companies()).bundles.get(key)
+    if bundle is None:
+        raise ValueError(f"unknown company: {key}")
+    merged = dict(record)
+    for k, v in bundle.defaults().items():
+        if not merged.get(k) and not (k == "selected_logo" and merged.get("logo")):
+            merged[k] = v
+    return merged
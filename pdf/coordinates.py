@@ -0,0 +1,190 @@
+"""
+Fixed geometry for the equipment issue PDF (points, origin bottom-left, A4).
+
+The static skeleton and the field overlay in pdf.generator both read from here,
+so the pre-rendered template and the stamped values can't drift apart.
+"""
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+from reportlab.lib.pagesizes import A4
+
+PAGE_W, PAGE_H = A4
+MARGIN = 36
+X0 = MARGIN
+Y_TOP = PAGE_H - MARGIN
+FORM_W = PAGE_W - 2 * MARGIN
+FORM_H = PAGE_H - 2 * MARGIN
+
+BAR_H = 16
+HEADER_H = 58
+LOGO_BOX_W = FORM_W * 0.42
+LOGO_PAD = 6
+
+# ---------- page 1: equipment issue record ----------
+META_H = 16
+META_Y = Y_TOP - META_H
+_meta_cols = [0.18, 0.34, 0.20, 0.28]
+META_XS = [X0]
+for _frac in _meta_cols[:-1]:
+    META_XS.append(META_XS[-1] + FORM_W * _frac)
+META_XS.append(X0 + FORM_W)
+META_XS = tuple(META_XS)
+
+HEADER_Y = META_Y - HEADER_H
+
+NOTICE_H = 70
+NOTICE_Y = HEADER_Y - NOTICE_H
+
+PERSONNEL_BAR_Y = NOTICE_Y - BAR_H
+
+FIELD_ROW_H = 20
+NAME_ROW_Y = PERSONNEL_BAR_Y - FIELD_ROW_H
+LOCATION_ROW_Y = NAME_ROW_Y - FIELD_ROW_H
+
+# Name/Date row columns: label | value | label | value
+_w1 = FORM_W * 0.18
+_w2 = FORM_W * 0.42
+_w3 = FORM_W * 0.12
+FIELD_XS = (X0, X0 + _w1, X0 + _w1 + _w2, X0 + _w1 + _w2 + _w3)
+
+EQUIPMENT_BAR_Y = LOCATION_ROW_Y - BAR_H
+
+TABLE_HEADER_H = 18
+TABLE_ROW_H = 18
+
+EQ_HEADER_Y = EQUIPMENT_BAR_Y - TABLE_HEADER_H
+_col_desc = FORM_W * 0.36
+_col_cond = FORM_W * 0.28
+_col_serial = FORM_W * 0.18
+# left edge of DESCRIPTION, CONDITION AT ISSUE, SERIAL No, ASSET No
+EQ_COL_XS = (X0, X0 + _col_desc, X0 + _col_desc + _col_cond, X0 + _col_desc + _col_cond + _col_serial)
+EQ_HEADERS = ("DESCRIPTION", "CONDITION AT ISSUE", "SERIAL No", "ASSET No")
+
+
+def eq_row_y(i: int) -> float:
+    """Bottom edge of issued-equipment row i."""
+    return EQ_HEADER_Y - (i + 1) * TABLE_ROW_H
+
+
+ISSUE_SIGN_H = 44
+ISSUE_BAR_Y = eq_row_y(9) - BAR_H
+ISSUE_SIGN_Y = ISSUE_BAR_Y - ISSUE_SIGN_H
+
+SIGN_MID = X0 + FORM_W * 0.5
+SIGN_LABEL_X = X0 + (SIGN_MID - X0) * 0.35          # left edge of the name value cell
+SIGN_RIGHT_LABEL_X = SIGN_MID + (X0 + FORM_W - SIGN_MID) * 0.35
+
+RETURNED_BAR_Y = ISSUE_SIGN_Y - BAR_H
+RET_HEADER_Y = RETURNED_BAR_Y - TABLE_HEADER_H
+_col_desc2 = FORM_W * 0.36
+_col_cond2 = FORM_W * 0.30
+_col_serial2 = FORM_W * 0.12
+_col_no2 = FORM_W * 0.08
+# left edge of DESCRIPTION, RETURNED CONDITION, SERIAL, No, ASSET No
+RET_COL_XS = (
+    X0,
+    X0 + _col_desc2,
+    X0 + _col_desc2 + _col_cond2,
+    X0 + _col_desc2 + _col_cond2 + _col_serial2,
+    X0 + _col_desc2 + _col_cond2 + _col_serial2 + _col_no2,
+)
+RET_HEADERS = ("DESCRIPTION", "RETURNED CONDITION", "SERIAL", "No", "ASSET No")
+
+
+def ret_row_y(i: int) -> float:
+    """Bottom edge of returned-equipment row i."""
+    return RET_HEADER_Y - (i + 1) * TABLE_ROW_H
+
+
+RETURN_SIGN_H = 40
+RETURN_BAR_Y = ret_row_y(7) - BAR_H
+RETURN_SIGN_Y = RETURN_BAR_Y - RETURN_SIGN_H
+
+FOOTER_Y = MARGIN + 10
+
+# ---------- continuation pages (table overflow) ----------
+CONT_TOP = Y_TOP
+CONT_BOTTOM = MARGIN + 20
+CONT_GAP = 14       # space between two sections on the same page
+
+
+# ---------- page 2: new starter passwords ----------
+PW_HEADER_Y = Y_TOP - HEADER_H
+PW_DETAILS_LABEL_Y = PW_HEADER_Y - 18
+PW_NAME_Y = PW_DETAILS_LABEL_Y - 14
+PW_INSTR_TOP = PW_NAME_Y - 18
+PW_INSTR_BOX_H = 44
+PW_INSTR_LINE_H = 12
+PW_INSTR_MAX_LINES = 3
+PW_KV_ROW_H = 18
+PW_KV_LABEL_W = FORM_W * 0.35
+PW_EXTRA_ROW_H = 18
+PW_EXTRA_COL_XS = (X0, X0 + FORM_W * 0.33, X0 + FORM_W * 0.33 + FORM_W * 0.34)
+PW_EXTRA_HEADERS = ("Software", "Account", "Password")
+PW_EXTRA_MIN_Y = MARGIN + 20
+
+PW_ACCOUNT_LABELS = (
+    "Laptop login username:",
+    "Laptop login password:",
+    "Microsoft 365 URL:",
+    "Microsoft 365 Username:",
+    "Microsoft 365 Password:",
+)
+PW_INFO_LABELS = ("SharePoint:", "IT Support Helpdesk:")
+
+
+class PasswordsLayout(NamedTuple):
+    account_bar_y: float
+    account_row_tops: Tuple[float, ...]  # top edge of each kv row
+    two_fa_y: float                      # baseline of the 2FA note (unused when off)
+    info_bar_y: float
+    info_row_tops: Tuple[float, ...]
+    extra_label_y: float
+    extra_header_top: float
+    extra_rows_top: float                # top edge of the first extra-account row
+
+
+@lru_cache(maxsize=2)
+def passwords_layout(two_fa: bool) -> PasswordsLayout:
+    """Page 2 shifts down by the 2FA note, so there are two fixed layouts."""
+    y = PW_INSTR_TOP - PW_INSTR_BOX_H - 10
+    account_bar_y = y
+    y -= BAR_H + 10
+
+    account_row_tops = []
+    for _ in PW_ACCOUNT_LABELS:
+        account_row_tops.append(y)
+        y -= PW_KV_ROW_H
+
+    two_fa_y = y
+    if two_fa:
+        y -= 10
+        two_fa_y = y
+        y -= 16
+
+    y -= 10
+    info_bar_y = y
+    y -= BAR_H + 10
+
+    info_row_tops = []
+    for _ in PW_INFO_LABELS:
+        info_row_tops.append(y)
+        y -= PW_KV_ROW_H
+
+    y -= 10
+    extra_label_y = y
+    y -= 12
+    extra_header_top = y
+    y -= TABLE_HEADER_H
+
+    return PasswordsLayout(
+        account_bar_y=account_bar_y,
+        account_row_tops=tuple(account_row_tops),
+        two_fa_y=two_fa_y,
+        info_bar_y=info_bar_y,
+        info_row_tops=tuple(info_row_tops),
+        extra_label_y=extra_label_y,
+        extra_header_top=extra_header_top,
+        extra_rows_top=y,
+    )
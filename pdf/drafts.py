@@ -0,0 +1,274 @@
+"""
+Autosaved drafts: one append-only JSON-lines journal per draft, under
+data/drafts/ (EQUIPMENT_DRAFTS overrides).
+
+    {"set": {"name": "Jack Smith", "date": {"$date": "2026-01-05"}}, "del": ["ret_desc_3"]}
+
+Each line is the change set of one flush; replaying the file gives the
+draft. Writes go through one background thread that coalesces a burst of
+changes into one append + fsync per draft (after DEBOUNCE_SECONDS of quiet,
+or MAX_DELAY_SECONDS at most), and rewrites a journal as a single snapshot
+line once it passes COMPACT_AFTER lines.
+
+Passwords are never written: laptop_password, m365_password and the
+Password column of extra_accounts are left out (a restored draft has them
+blank).
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+log = logging.getLogger("equipment_form.drafts")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DRAFTS_DIR = Path(os.environ.get("EQUIPMENT_DRAFTS", PROJECT_ROOT / "data" / "drafts"))
+
+DEBOUNCE_SECONDS = 0.5
+MAX_DELAY_SECONDS = 2.0
+COMPACT_AFTER = 200             # journal lines
+DRAFT_TTL_SECONDS = 14 * 86400  # untouched drafts older than this are removed
+
+SECRET_KEYS = frozenset({"laptop_password", "m365_password"})
+
+# session-state keys a draft carries (besides the eq_* / ret_* rows)
+DRAFT_KEYS = frozenset({
+    "name", "date", "work_location", "issuer_name", "receiver_name", "return_issuer", "return_receiver",
+    "company", "selected_logo",
+    "starter_full_name", "starter_role", "starter_instructions",
+    "laptop_username", "domain_username", "m365_user_base", "m365_domain", "m365_username", "m365_2fa",
+    "sharepoint_url", "helpdesk_email", "extra_accounts",
+    "eq_row_count", "ret_row_count", "_return_form_id",
+})
+_ROW_KEY = re.compile(r"^(eq|ret)_(?:desc|condition|serial|asset)_\d+$")
+_DRAFT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_DELETED = object()
+
+
+def new_draft_id() -> str:
+    return uuid.uuid4().hex
+
+
+def valid_draft_id(draft_id) -> bool:
+    return isinstance(draft_id, str) and bool(_DRAFT_ID.match(draft_id))
+
+
+# ---------- values ----------
+def _encode(key: str, value):
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if key == "extra_accounts":
+        return [{k: ("" if k == "Password" else v) for k, v in (r or {}).items()} for r in value or []]
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and "$date" in value:
+        return date.fromisoformat(value["$date"])
+    return value
+
+
+def draft_fields(state: Mapping) -> Dict[str, object]:
+    """The journaled part of a session state, JSON-ready, with secrets left out."""
+    out = {}
+    for k, v in state.items():
+        if isinstance(k, str) and (k in DRAFT_KEYS or _ROW_KEY.match(k)) and k not in SECRET_KEYS:
+            out[k] = _encode(k, v)
+    return out
+
+
+def decode_fields(fields: Mapping) -> Dict[str, object]:
+    """draft_fields() output -> session-state values (dates back to date objects)."""
+    return {k: _decode(v) for k, v in fields.items()}
+
+
+# ---------- journal files ----------
+def _replay(path: Path) -> Dict[str, object]:
+    fields = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # a torn last line from a crash mid-append: everything before it stands
+                log.warning("skipping unreadable line in %s", path.name)
+                continue
+            fields.update(entry.get("set") or {})
+            for k in entry.get("del") or ():
+                fields.pop(k, None)
+    return fields
+
+
+def _line(changes: Mapping) -> str:
+    entry = {
+        "set": {k: v for k, v in changes.items() if v is not _DELETED},
+        "del": [k for k, v in changes.items() if v is _DELETED],
+    }
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+
+
+class DraftWriter:
+    """
+    Single background thread that owns the journal files. submit() only
+    records the change in memory; the thread appends it once edits pause.
+    """
+
+    def __init__(self, directory=DEFAULT_DRAFTS_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Dict[str, object]] = {}   # draft_id -> key -> value / _DELETED
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._writing = False
+        self._lines: Dict[str, int] = {}                    # draft_id -> journal lines (writer thread only)
+        self._prune()
+        self._thread = threading.Thread(target=self._run, name="draft-writer", daemon=True)
+        self._thread.start()
+
+    def path(self, draft_id: str) -> Path:
+        if not valid_draft_id(draft_id):
+            raise ValueError(f"bad draft id {draft_id!r}")
+        return self.directory / f"{draft_id}.jsonl"
+
+    # ---------- API ----------
+    def submit(self, draft_id: str, changes: Mapping, deleted=()):
+        """Queue changed (JSON-ready) fields and removed keys for a draft."""
+        if not changes and not deleted:
+            return
+        self.path(draft_id)
+        now = time.monotonic()
+        with self._cond:
+            if not self._pending:
+                self._first_change = now
+            pending = self._pending.setdefault(draft_id, {})
+            pending.update(changes)
+            pending.update(dict.fromkeys(deleted, _DELETED))
+            self._last_change = now
+            self._cond.notify_all()
+
+    def load(self, draft_id: str) -> Optional[Dict[str, object]]:
+        """A draft's fields (file plus anything not yet flushed), or None if there is no such draft."""
+        path = self.path(draft_id)
+        with self._cond:
+            pending = dict(self._pending.get(draft_id) or {})
+        if not path.exists() and not pending:
+            return None
+        fields = _replay(path) if path.exists() else {}
+        for k, v in pending.items():
+            if v is _DELETED:
+                fields.pop(k, None)
+            else:
+                fields[k] = v
+        return fields
+
+    def discard(self, draft_id: str):
+        path = self.path(draft_id)
+        with self._cond:
+            self._pending.pop(draft_id, None)
+            # wait out a write in progress so it can't recreate the file
+            while self._writing:
+                self._cond.wait()
+            self._lines.pop(draft_id, None)
+            path.unlink(missing_ok=True)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until everything submitted so far is on disk (tests / shutdown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._last_change = self._first_change = 0.0   # skip the debounce
+            self._cond.notify_all()
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return
+                self._cond.wait(remaining)
+
+    # ---------- writer thread ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # debounce: wait for a pause in edits, but not past MAX_DELAY_SECONDS
+                while True:
+                    now = time.monotonic()
+                    due = min(self._last_change + DEBOUNCE_SECONDS, self._first_change + MAX_DELAY_SECONDS)
+                    if now >= due or not self._pending:
+                        break
+                    self._cond.wait(due - now)
+                batch, self._pending = self._pending, {}
+                self._writing = True
+
+            for draft_id, changes in batch.items():
+                try:
+                    self._append(draft_id, changes)
+                except Exception:
+                    log.exception("failed to write draft %s", draft_id)
+
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _append(self, draft_id: str, changes: Mapping):
+        path = self.path(draft_id)
+        lines = self._lines.get(draft_id)
+        prefix = ""
+        if lines is None:
+            # first write to this journal in this process
+            data = path.read_bytes() if path.exists() else b""
+            lines = data.count(b"\n")
+            if data and not data.endswith(b"\n"):
+                prefix = "\n"     # end a torn line so it doesn't swallow the next one
+
+        if lines + 1 > COMPACT_AFTER:
+            fields = _replay(path)
+            fields.update({k: v for k, v in changes.items() if v is not _DELETED})
+            for k in [k for k, v in changes.items() if v is _DELETED]:
+                fields.pop(k, None)
+            self._compact(path, fields)
+            self._lines[draft_id] = 1
+            return
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(prefix + _line(changes))
+            f.flush()
+            os.fsync(f.fileno())
+        self._lines[draft_id] = lines + 1
+
+    def _compact(self, path: Path, fields: Mapping):
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(_line(fields))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _prune(self):
+        cutoff = time.time() - DRAFT_TTL_SECONDS
+        for p in self.directory.glob("*.jsonl"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+            except OSError:
+                pass
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_draft_writer(directory=DEFAULT_DRAFTS_DIR) -> DraftWriter:
+    """Process-wide draft writer (created on first use)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DraftWriter(directory)
+        return _writer
@@ -0,0 +1,656 @@
+import hashlib
+import threading
+from io import BytesIO
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+
+from pdf import coordinates as L
+from pdf.assets import fitted_logo, get_logo
+from pdf.model import EQ_ROWS, RET_ROWS, Accounts, EquipmentIssueForm, EquipmentRow
+from pdf.text import fit, wrap
+from pdf.timing import span
+
+YELLOW = colors.HexColor("#f4b400")
+BLUE = colors.HexColor("#cfe2f3")
+
+TEMPLATE_PATH = Path(__file__).parent / "templates" / "base_form.pdf"
+
+
+class OutputProfile(NamedTuple):
+    page_compression: int
+    logo_dpi: Optional[int]     # None = embed the logo at full resolution
+
+
+# "print": full-resolution logo. "archive": logo resampled to the header box at
+# 150 dpi, for the thousands of copies kept on the HR share.
+PROFILES = {
+    "print": OutputProfile(page_compression=1, logo_dpi=None),
+    "archive": OutputProfile(page_compression=1, logo_dpi=150),
+}
+
+_EMPTY_ROW = EquipmentRow()
+
+
+# ---------- drawing helpers ----------
+def _txt(c, x, y, text, size=9, bold=False, color=colors.black):
+    c.setFont("Helvetica-Bold" if bold else "Helvetica", size)
+    c.setFillColor(color)
+    c.drawString(x, y, "" if text is None else str(text))
+    c.setFillColor(colors.black)
+
+
+def _cell(c, x, y, w, text, size=9, pad=4, bold=False):
+    """Value in a cell whose left edge is x and width w: shrunk, then ellipsized, to stay inside."""
+    font = "Helvetica-Bold" if bold else "Helvetica"
+    text, size = fit(text, font, size, w - 2 * pad)
+    _txt(c, x + pad, y, text, size=size, bold=bold)
+
+
+def _center(c, x, y, w, text, size=9, bold=True):
+    c.setFont("Helvetica-Bold" if bold else "Helvetica", size)
+    c.setFillColor(colors.black)
+    c.drawCentredString(x + w / 2, y, "" if text is None else str(text))
+
+
+def _rect(c, x, y, w, h, fill=None, stroke=1):
+    if fill is None:
+        c.setFillColor(colors.white)
+        c.rect(x, y, w, h, stroke=stroke, fill=0)
+    else:
+        c.setFillColor(fill)
+        c.rect(x, y, w, h, stroke=stroke, fill=1)
+    c.setFillColor(colors.black)
+
+
+def _hline(c, x1, x2, y):
+    c.line(x1, y, x2, y)
+
+
+def _vline(c, x, y1, y2):
+    c.line(x, y1, x, y2)
+
+
+def _draw_logo(c, logo_path, x, y, box_w, box_h, dpi=None):
+    """
+    Draw the logo from the process-wide cache (pdf.assets), resampled for `dpi` if given.
+    The same ImageReader is used for both pages, so reportlab embeds it once.
+    """
+    if not logo_path:
+        return
+
+    try:
+        pad = L.LOGO_PAD
+        draw_w = box_w - 2 * pad
+        draw_h = box_h - 2 * pad
+
+        if dpi:
+            img = fitted_logo(logo_path, draw_w, draw_h, dpi)
+        else:
+            img = get_logo(logo_path).reader
+
+        c.drawImage(
+            img,
+            x + pad,
+            y + pad,
+            width=draw_w,
+            height=draw_h,
+            preserveAspectRatio=True,
+            anchor="sw",
+        )
+    except Exception as e:
+        _txt(c, x + 6, y + 6, f"Logo error: {e}", size=6, bold=False)
+
+
+# ---------- page 1: equipment issue record ----------
+_NOTICE1 = (
+    "This form must be completed upon issue of equipment / technology / software which is provided to you. "
+    "This form will be kept on your personnel file and used to monitor the condition and return of any equipment "
+    "should you depart the company."
+)
+_NOTICE2 = (
+    "Be aware that damages or loss of issued items which are not rectified will result in a proportionate and "
+    "reasonable charge for repair or replacement which will be deducted from your final salary."
+)
+
+
+def _table_grid(c, col_xs, y, h):
+    _rect(c, L.X0, y, L.FORM_W, h, fill=None, stroke=1)
+    for xx in col_xs[1:]:
+        _vline(c, xx, y, y + h)
+
+
+def _table_headers(c, col_xs, headers, y, size=7):
+    edges = list(col_xs) + [L.X0 + L.FORM_W]
+    for i, label in enumerate(headers):
+        _center(c, edges[i], y + 6, edges[i + 1] - edges[i], label, size=size, bold=True)
+
+
+def _table_row(c, col_xs, y, values, size=7, pad=4):
+    """One row of cell values (None = blank column), each clipped to its column; y is the row's bottom edge."""
+    edges = list(col_xs) + [L.X0 + L.FORM_W]
+    for i, value in enumerate(values):
+        if value:
+            _cell(c, edges[i], y + 5, edges[i + 1] - edges[i], value, size=size, pad=pad)
+
+
+def _signoff_grid(c, y, h):
+    _rect(c, L.X0, y, L.FORM_W, h, fill=None, stroke=1)
+    _vline(c, L.SIGN_MID, y, y + h)
+    _vline(c, L.SIGN_LABEL_X, y, y + h)
+    _vline(c, L.SIGN_RIGHT_LABEL_X, y, y + h)
+    _hline(c, L.X0, L.X0 + L.FORM_W, y + h / 2)
+
+
+def _draw_issue_static(c):
+    """Everything on page 1 that doesn't depend on the form (no logo)."""
+    x0, form_w = L.X0, L.FORM_W
+
+    # Outer border
+    _rect(c, x0, L.MARGIN, form_w, L.FORM_H, fill=None, stroke=1)
+
+    # --- Top meta row ---
+    y = L.META_Y
+    xs = L.META_XS
+    _rect(c, x0, y, form_w, L.META_H, fill=None, stroke=1)
+    for x in xs[1:-1]:
+        _vline(c, x, y, y + L.META_H)
+
+    _center(c, xs[0], y + 4, xs[1] - xs[0], "D5.HRS.016", size=7, bold=False)
+    _center(c, xs[1], y + 4, xs[2] - xs[1], "Equipment Issue Form", size=7, bold=False)
+    _center(c, xs[2], y + 4, xs[3] - xs[2], "Version 1.2", size=7, bold=False)
+    _center(c, xs[3], y + 4, xs[4] - xs[3], "2021-10-12", size=7, bold=False)
+
+    # --- Header area: logo left + title right ---
+    y = L.HEADER_Y
+    _rect(c, x0, y, form_w, L.HEADER_H, fill=None, stroke=1)
+    _vline(c, x0 + L.LOGO_BOX_W, y, y + L.HEADER_H)
+    _txt(c, x0 + L.LOGO_BOX_W + 10, y + L.HEADER_H - 22, "EQUIPMENT ISSUE RECORD", size=12, bold=True)
+
+    # --- Notices box ---
+    y = L.NOTICE_Y
+    notice_h = L.NOTICE_H
+    _rect(c, x0, y, form_w, notice_h, fill=None, stroke=1)
+
+    c.setFont("Helvetica", 7)
+    text_w = form_w - 16
+    # first notice hangs from the top of the box, the second sits on the bottom
+    for n, line in enumerate(wrap(_NOTICE1, "Helvetica", 7, text_w, max_lines=3)):
+        c.drawString(x0 + 8, y + notice_h - 18 - n * 12, line)
+    notice2 = wrap(_NOTICE2, "Helvetica", 7, text_w, max_lines=2)
+    for n, line in enumerate(notice2):
+        c.drawString(x0 + 8, y + 6 + (len(notice2) - 1 - n) * 12, line)
+
+    # --- Yellow section ---
+    y = L.PERSONNEL_BAR_Y
+    _rect(c, x0, y, form_w, L.BAR_H, fill=YELLOW, stroke=1)
+    _center(c, x0, y + 4, form_w, "EQUIPMENT ISSUED TO: PERSONNEL DETAIL", size=8, bold=True)
+
+    # --- Name/Date row ---
+    x1, x2, x3, x4 = L.FIELD_XS
+    y = L.NAME_ROW_Y
+    _rect(c, x0, y, form_w, L.FIELD_ROW_H, fill=None, stroke=1)
+    for xx in [x2, x3, x4]:
+        _vline(c, xx, y, y + L.FIELD_ROW_H)
+    _txt(c, x1 + 6, y + 6, "NAME:", size=8, bold=True)
+    _txt(c, x3 + 6, y + 6, "DATE", size=8, bold=True)
+
+    # --- Work location row ---
+    y = L.LOCATION_ROW_Y
+    _rect(c, x0, y, form_w, L.FIELD_ROW_H, fill=None, stroke=1)
+    _vline(c, x2, y, y + L.FIELD_ROW_H)
+    _txt(c, x1 + 6, y + 6, "WORK LOCATION:", size=8, bold=True)
+
+    # --- Yellow section: EQUIPMENT ---
+    y = L.EQUIPMENT_BAR_Y
+    _rect(c, x0, y, form_w, L.BAR_H, fill=YELLOW, stroke=1)
+    _center(c, x0, y + 4, form_w, "EQUIPMENT", size=8, bold=True)
+
+    # --- Equipment table ---
+    _table_grid(c, L.EQ_COL_XS, L.EQ_HEADER_Y, L.TABLE_HEADER_H)
+    _table_headers(c, L.EQ_COL_XS, L.EQ_HEADERS, L.EQ_HEADER_Y)
+    for i in range(EQ_ROWS):
+        _table_grid(c, L.EQ_COL_XS, L.eq_row_y(i), L.TABLE_ROW_H)
+
+    # --- Yellow section: ISSUE SIGNOFF ---
+    y = L.ISSUE_BAR_Y
+    _rect(c, x0, y, form_w, L.BAR_H, fill=YELLOW, stroke=1)
+    _center(c, x0, y + 4, form_w, "ISSUE SIGNOFF", size=8, bold=True)
+
+    y, sign_h = L.ISSUE_SIGN_Y, L.ISSUE_SIGN_H
+    _signoff_grid(c, y, sign_h)
+    _txt(c, x0 + 6, y + sign_h - 14, "ISSUER NAME", size=7, bold=True)
+    _txt(c, L.SIGN_MID + 6, y + sign_h - 14, "ISSUER SIGN", size=7, bold=True)
+    _txt(c, x0 + 6, y + 8, "RECEIVER NAME", size=7, bold=True)
+    _txt(c, L.SIGN_MID + 6, y + 8, "RECEIVER SIGN", size=7, bold=True)
+
+    # (RETURNS DETAIL date removed — the UI no longer captures a return date)
+
+    # --- Blue section: RETURNED EQUIPMENT ---
+    y = L.RETURNED_BAR_Y
+    _rect(c, x0, y, form_w, L.BAR_H, fill=BLUE, stroke=1)
+    _center(c, x0, y + 4, form_w, "RETURNED EQUIPMENT", size=8, bold=True)
+
+    _table_grid(c, L.RET_COL_XS, L.RET_HEADER_Y, L.TABLE_HEADER_H)
+    _table_headers(c, L.RET_COL_XS, L.RET_HEADERS, L.RET_HEADER_Y)
+    for i in range(RET_ROWS):
+        _table_grid(c, L.RET_COL_XS, L.ret_row_y(i), L.TABLE_ROW_H)
+
+    # --- Blue section: EQUIPMENT RETURN SIGNOFF ---
+    y = L.RETURN_BAR_Y
+    _rect(c, x0, y, form_w, L.BAR_H, fill=BLUE, stroke=1)
+    _center(c, x0, y + 4, form_w, "EQUIPMENT RETURN SIGNOFF", size=8, bold=True)
+
+    y, sign_h = L.RETURN_SIGN_Y, L.RETURN_SIGN_H
+    _signoff_grid(c, y, sign_h)
+    _txt(c, x0 + 6, y + sign_h - 14, "ISSUER NAME", size=7, bold=True)
+    _txt(c, L.SIGN_MID + 6, y + sign_h - 14, "ISSUER SIGN", size=7, bold=True)
+    _txt(c, x0 + 6, y + 6, "RECEIVER NAME", size=7, bold=True)
+    _txt(c, L.SIGN_MID + 6, y + 6, "RECEIVER SIGN", size=7, bold=True)
+
+    footer_text = "Please attach photographs on attached pages of any recorded defect or condition."
+    c.setFont("Helvetica", 8)
+    c.setFillColor(colors.red)
+    c.drawCentredString(x0 + form_w / 2, L.FOOTER_Y, footer_text)
+    c.setFillColor(colors.black)
+
+
+def _draw_issue_fields(c, form: EquipmentIssueForm):
+    """Stamp the form values onto page 1."""
+    person = form.personnel
+    x1, x2, x3, x4 = L.FIELD_XS
+    right = L.X0 + L.FORM_W
+    sign_w = L.SIGN_MID - L.SIGN_LABEL_X
+
+    with span("issue.personnel"):
+        _cell(c, x2, L.NAME_ROW_Y + 6, x3 - x2, person.name, size=8, pad=6)
+        _cell(c, x4, L.NAME_ROW_Y + 6, right - x4, person.date, size=8, pad=6)
+        _cell(c, x2, L.LOCATION_ROW_Y + 6, right - x2, person.work_location, size=8, pad=6)
+
+    with span("issue.equipment_table"):
+        for i, r in enumerate(form.equipment[:EQ_ROWS]):
+            _table_row(c, L.EQ_COL_XS, L.eq_row_y(i), (r.description, r.condition, r.serial, r.asset))
+
+    with span("issue.signoff"):
+        y, sign_h = L.ISSUE_SIGN_Y, L.ISSUE_SIGN_H
+        _cell(c, L.SIGN_LABEL_X, y + sign_h - 14, sign_w, person.issuer_name, size=7, pad=6)
+        _cell(c, L.SIGN_LABEL_X, y + 8, sign_w, person.receiver_name, size=7, pad=6)
+
+    _draw_return_fields(c, form)
+
+
+def _draw_return_fields(c, form: EquipmentIssueForm):
+    """The return section of page 1: returned rows and the return sign-off."""
+    person = form.personnel
+    sign_w = L.SIGN_MID - L.SIGN_LABEL_X
+
+    with span("return.table"):
+        for i, r in enumerate(form.returned[:RET_ROWS]):
+            _table_row(c, L.RET_COL_XS, L.ret_row_y(i), (r.description, r.condition, r.serial, None, r.asset))
+
+    with span("return.signoff"):
+        y, sign_h = L.RETURN_SIGN_Y, L.RETURN_SIGN_H
+        _cell(c, L.SIGN_LABEL_X, y + sign_h - 14, sign_w, person.return_issuer, size=7, pad=6)
+        _cell(c, L.SIGN_LABEL_X, y + 6, sign_w, person.return_receiver, size=7, pad=6)
+
+
+def _blank_return_cells(c):
+    """
+    White out the insides of the returned-row and return sign-off name cells,
+    grid lines left showing, so whatever the issued PDF already had in them
+    doesn't show through the return overlay.
+    """
+    inset = 2
+    right = L.X0 + L.FORM_W
+    c.setFillColor(colors.white)
+    for i in range(RET_ROWS):
+        y = L.ret_row_y(i)
+        edges = list(L.RET_COL_XS) + [right]
+        for x_left, x_right in zip(edges, edges[1:]):
+            c.rect(x_left + inset, y + inset, x_right - x_left - 2 * inset, L.TABLE_ROW_H - 2 * inset, stroke=0, fill=1)
+
+    y, half = L.RETURN_SIGN_Y, L.RETURN_SIGN_H / 2
+    for bottom in (y, y + half):
+        c.rect(L.SIGN_LABEL_X + inset, bottom + inset, L.SIGN_MID - L.SIGN_LABEL_X - 2 * inset, half - 2 * inset, stroke=0, fill=1)
+    c.setFillColor(colors.black)
+
+
+# ---------- page 2: passwords ----------
+def _kv_static(c, top, label):
+    row_h = L.PW_KV_ROW_H
+    _rect(c, L.X0, top - row_h, L.FORM_W, row_h, fill=None, stroke=1)
+    _vline(c, L.X0 + L.PW_KV_LABEL_W, top - row_h, top)
+    _txt(c, L.X0 + 6, top - row_h + 5, label, size=8, bold=True)
+
+
+def _kv_value(c, top, value):
+    x = L.X0 + L.PW_KV_LABEL_W
+    _cell(c, x, top - L.PW_KV_ROW_H + 5, L.X0 + L.FORM_W - x, value, size=8, pad=6)
+
+
+def _extra_row_grid(c, top, h):
+    xs = L.PW_EXTRA_COL_XS
+    _rect(c, L.X0, top - h, L.FORM_W, h, fill=None, stroke=1)
+    _vline(c, xs[1], top - h, top)
+    _vline(c, xs[2], top - h, top)
+
+
+def _draw_passwords_static(c, two_fa: bool):
+    """Everything on page 2 that doesn't depend on the form (no logo, no extra-account rows)."""
+    x0, form_w = L.X0, L.FORM_W
+    lay = L.passwords_layout(two_fa)
+
+    # Header area: logo left + title right
+    y = L.PW_HEADER_Y
+    _rect(c, x0, y, form_w, L.HEADER_H, fill=None, stroke=1)
+    _vline(c, x0 + L.LOGO_BOX_W, y, y + L.HEADER_H)
+    _txt(c, x0 + L.LOGO_BOX_W + 10, y + L.HEADER_H - 22, "NEW STARTER PASSWORDS", size=12, bold=True)
+
+    _txt(c, x0, L.PW_DETAILS_LABEL_Y, "New Starter Details", size=10, bold=True)
+
+    # Instructions box
+    _rect(c, x0, L.PW_INSTR_TOP - L.PW_INSTR_BOX_H + 10, form_w, L.PW_INSTR_BOX_H, fill=None, stroke=1)
+
+    # Section header
+    _rect(c, x0, lay.account_bar_y, form_w, L.BAR_H, fill=YELLOW, stroke=1)
+    _center(c, x0, lay.account_bar_y + 4, form_w, "ACCOUNT DETAILS", size=9, bold=True)
+
+    # ---- Laptop login (instead of Domain) + Microsoft 365 ----
+    for top, label in zip(lay.account_row_tops, L.PW_ACCOUNT_LABELS):
+        _kv_static(c, top, label)
+
+    if two_fa:
+        _txt(c, x0 + 2, lay.two_fa_y, "2 Factor Authentication setup required", size=9, bold=True)
+
+    # Useful info
+    _rect(c, x0, lay.info_bar_y, form_w, L.BAR_H, fill=YELLOW, stroke=1)
+    _center(c, x0, lay.info_bar_y + 4, form_w, "USEFUL INFO", size=9, bold=True)
+    for top, label in zip(lay.info_row_tops, L.PW_INFO_LABELS):
+        _kv_static(c, top, label)
+
+    # Extra accounts table header
+    _txt(c, x0, lay.extra_label_y, "Extra Accounts", size=10, bold=True)
+
+    th = L.TABLE_HEADER_H
+    top = lay.extra_header_top
+    _extra_row_grid(c, top, th)
+    edges = list(L.PW_EXTRA_COL_XS) + [x0 + form_w]
+    for i, label in enumerate(L.PW_EXTRA_HEADERS):
+        _center(c, edges[i], top - th + 6, edges[i + 1] - edges[i], label, size=8, bold=True)
+
+
+def _draw_passwords_fields(c, accounts: Accounts):
+    """
+    Stamp the account values (and extra-account rows) onto page 2.
+    Returns the extra-account rows that didn't fit.
+    """
+    x0, form_w = L.X0, L.FORM_W
+    lay = L.passwords_layout(accounts.m365_2fa)
+
+    with span("passwords.wrap"):
+        name_line = f"{accounts.starter_full_name} – {accounts.starter_role}".strip(" –")
+        _cell(c, x0, L.PW_NAME_Y, form_w, name_line, size=9, pad=0)
+
+        c.setFont("Helvetica", 9)
+        c.setFillColor(colors.black)
+
+        lines = wrap(accounts.starter_instructions, "Helvetica", 9, form_w - 16, max_lines=L.PW_INSTR_MAX_LINES)
+        ty = L.PW_INSTR_TOP - 8
+        for ln in lines:
+            c.drawString(x0 + 8, ty, ln)
+            ty -= L.PW_INSTR_LINE_H
+
+    with span("passwords.accounts"):
+        values = (
+            accounts.laptop_username,
+            accounts.laptop_password,
+            "https://www.office.com/",
+            accounts.m365_email,
+            accounts.m365_password,
+        )
+        for top, value in zip(lay.account_row_tops, values):
+            _kv_value(c, top, value)
+
+        for top, value in zip(lay.info_row_tops, (accounts.sharepoint_url, accounts.helpdesk_email)):
+            _kv_value(c, top, value)
+
+    with span("passwords.extra_table"):
+        xs = L.PW_EXTRA_COL_XS
+        row_h = L.PW_EXTRA_ROW_H
+        y = lay.extra_rows_top
+        for n, r in enumerate(accounts.extra):
+            if (y - row_h) < L.PW_EXTRA_MIN_Y:
+                # the rest flows onto continuation pages
+                return accounts.extra[n:]
+
+            _extra_row_grid(c, y, row_h)
+            _table_row(c, xs, y - row_h, (r.software, r.account, r.password), size=8, pad=5)
+
+            y -= row_h
+    return ()
+
+
+# ---------- continuation pages ----------
+class _Section(NamedTuple):
+    title: str
+    fill: object
+    col_xs: tuple
+    headers: tuple
+    rows: list          # one tuple of cell strings per row, aligned with col_xs (None = blank column)
+    size: int = 7
+    pad: int = 4
+
+
+def _return_overflow(form: EquipmentIssueForm) -> _Section:
+    return _Section(
+        "RETURNED EQUIPMENT", BLUE, L.RET_COL_XS, L.RET_HEADERS,
+        [(r.description, r.condition, r.serial, None, r.asset) for r in form.returned[RET_ROWS:]],
+    )
+
+
+def _issue_overflow(form: EquipmentIssueForm) -> List[_Section]:
+    return [
+        _Section(
+            "EQUIPMENT", YELLOW, L.EQ_COL_XS, L.EQ_HEADERS,
+            [(r.description, r.condition, r.serial, r.asset) for r in form.equipment[EQ_ROWS:]],
+        ),
+        _return_overflow(form),
+    ]
+
+
+def _extra_overflow(rows) -> List[_Section]:
+    return [
+        _Section(
+            "EXTRA ACCOUNTS", YELLOW, L.PW_EXTRA_COL_XS, L.PW_EXTRA_HEADERS,
+            [(r.software, r.account, r.password) for r in rows], size=8, pad=5,
+        ),
+    ]
+
+
+def _draw_continuation(c, sections: List[_Section]):
+    """
+    Flow table rows that didn't fit onto as many pages as needed, repeating the
+    section bar and column headers at the top of each page. Ends with showPage().
+    """
+    row_h = L.TABLE_ROW_H
+    y = None  # None = no continuation page open yet
+
+    for sec in sections:
+        i = 0
+        while i < len(sec.rows):
+            if y is None or y - (L.BAR_H + L.TABLE_HEADER_H + row_h) < L.CONT_BOTTOM:
+                if y is not None:
+                    c.showPage()
+                y = L.CONT_TOP
+
+            y -= L.BAR_H
+            _rect(c, L.X0, y, L.FORM_W, L.BAR_H, fill=sec.fill, stroke=1)
+            _center(c, L.X0, y + 4, L.FORM_W, f"{sec.title} (continued)", size=8, bold=True)
+
+            y -= L.TABLE_HEADER_H
+            _table_grid(c, sec.col_xs, y, L.TABLE_HEADER_H)
+            _table_headers(c, sec.col_xs, sec.headers, y, size=sec.size)
+
+            while i < len(sec.rows) and y - row_h >= L.CONT_BOTTOM:
+                y -= row_h
+                _table_grid(c, sec.col_xs, y, row_h)
+                _table_row(c, sec.col_xs, y, sec.rows[i], size=sec.size, pad=sec.pad)
+                i += 1
+
+        if y is not None:
+            y -= L.CONT_GAP
+
+    if y is not None:
+        c.showPage()
+
+
+# ---------- static skeleton cache ----------
+# Each skeleton is drawn once per process on a scratch canvas and kept as its raw
+# content-stream operators. Per document it is wrapped in one form XObject and
+# placed with a single `Do`, so only the field values are drawn per export.
+_SKELETONS = {
+    "issue": _draw_issue_static,
+    "passwords": lambda c: _draw_passwords_static(c, two_fa=False),
+    "passwords_2fa": lambda c: _draw_passwords_static(c, two_fa=True),
+}
+_skeleton_ops = {}
+_skeleton_lock = threading.Lock()
+
+
+def _register_fonts(c):
+    # Fix the internal font names (/F1, /F2) so captured operators stay valid in any document.
+    for font in ("Helvetica", "Helvetica-Bold"):
+        c._doc.getInternalFontName(font)
+
+
+def _get_skeleton_ops(key: str) -> str:
+    with _skeleton_lock:
+        ops = _skeleton_ops.get(key)
+        if ops is None:
+            scratch = canvas.Canvas(BytesIO(), pagesize=A4)
+            _register_fonts(scratch)
+            start = len(scratch._code)
+            _SKELETONS[key](scratch)
+            ops = "\n".join(scratch._code[start:])
+            _skeleton_ops[key] = ops
+        return ops
+
+
+def _place_skeleton(c, key: str):
+    name = f"skeleton_{key}"
+    if not c.hasForm(name):
+        c.beginForm(name)
+        c._code.append(_get_skeleton_ops(key))
+        c.endForm()
+    c.doForm(name)
+
+
+# ---------- main PDF generator ----------
+class RenderedPdf(NamedTuple):
+    data: bytes
+    sha256: str     # hex digest of `data`
+
+
+def render_equipment_issue_pdf(
+    form: EquipmentIssueForm, template: bool = True, size: str = "print", invariant: bool = False
+) -> bytes:
+    """
+    Render the two-page equipment issue PDF for a form record.
+
+    With template=True (default) the static parts of each page come from the
+    cached skeleton; template=False draws everything directly (same output).
+    `size` picks an output profile from PROFILES ("print" or "archive").
+    invariant=True fixes the creation date and document ID, so the same form
+    always gives byte-identical output.
+    """
+    try:
+        profile = PROFILES[size]
+    except KeyError:
+        raise ValueError(f"unknown size profile {size!r} (expected one of: {', '.join(PROFILES)})") from None
+
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4, pageCompression=profile.page_compression, invariant=int(invariant))
+    _register_fonts(c)
+
+    # --- page 1 ---
+    with span("issue.skeleton"):
+        if template:
+            _place_skeleton(c, "issue")
+        else:
+            _draw_issue_static(c)
+    with span("issue.logo"):
+        _draw_logo(c, form.logo_path, L.X0, L.HEADER_Y, L.LOGO_BOX_W, L.HEADER_H, profile.logo_dpi)
+    _draw_issue_fields(c, form)
+    c.showPage()
+
+    if len(form.equipment) > EQ_ROWS or len(form.returned) > RET_ROWS:
+        with span("continuation"):
+            _draw_continuation(c, _issue_overflow(form))
+
+    # --- page 2 ---
+    two_fa = form.accounts.m365_2fa
+    with span("passwords.skeleton"):
+        if template:
+            _place_skeleton(c, "passwords_2fa" if two_fa else "passwords")
+        else:
+            _draw_passwords_static(c, two_fa)
+    with span("passwords.logo"):
+        _draw_logo(c, form.logo_path, L.X0, L.PW_HEADER_Y, L.LOGO_BOX_W, L.HEADER_H, profile.logo_dpi)
+    extra_overflow = _draw_passwords_fields(c, form.accounts)
+    c.showPage()
+
+    if extra_overflow:
+        with span("continuation"):
+            _draw_continuation(c, _extra_overflow(extra_overflow))
+
+    with span("save"):
+        c.save()
+
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+def render_pdf(form: EquipmentIssueForm, size: str = "print") -> RenderedPdf:
+    """Deterministic render plus its content hash, for caches and stores that skip duplicate writes."""
+    data = render_equipment_issue_pdf(form, size=size, invariant=True)
+    return RenderedPdf(data, hashlib.sha256(data).hexdigest())
+
+
+def render_return_overlay(form: EquipmentIssueForm) -> bytes:
+    """
+    Just the return section of a form: page 1 holds only the returned rows and
+    the return sign-off, on blanked cells (to be laid over an issued PDF's
+    first page, see pdf/returns.py), followed by continuation pages for
+    returned rows past RET_ROWS.
+    """
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4, invariant=1)
+    _register_fonts(c)
+
+    _blank_return_cells(c)
+    _draw_return_fields(c, form)
+    c.showPage()
+    if len(form.returned) > RET_ROWS:
+        with span("continuation"):
+            _draw_continuation(c, [_return_overflow(form)])
+
+    c.save()
+    return buffer.getvalue()
+
+
+def write_base_form(path=TEMPLATE_PATH):
+    """Write the blank skeleton (page 1, page 2 with the 2FA note) as a reference PDF."""
+    c = canvas.Canvas(str(path), pagesize=A4)
+    _draw_issue_static(c)
+    c.showPage()
+    _draw_passwords_static(c, two_fa=True)
+    c.showPage()
+    c.save()
+
+
+if __name__ == "__main__":
+    write_base_form()
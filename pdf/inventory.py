@@ -0,0 +1,207 @@
+"""
+In-memory prefix index over an equipment inventory CSV.
+
+The CSV needs ASSET No, SERIAL No and DESCRIPTION columns (header names are
+matched case-insensitively; "asset", "serial", "description" also work).
+It is parsed once per process into sorted key arrays, and re-checked by
+mtime on each access. Rows appended to the end of the file are parsed on
+their own (the already parsed part must hash the same as before); any
+other edit triggers a full reload.
+"""
+import csv
+import hashlib
+import io
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_INVENTORY_PATH = Path(os.environ.get("EQUIPMENT_INVENTORY_CSV", PROJECT_ROOT / "data" / "inventory.csv"))
+
+_COLUMNS = {
+    "asset": ("asset no", "asset", "asset_no", "asset number"),
+    "serial": ("serial no", "serial", "serial_no", "serial number"),
+    "description": ("description", "desc"),
+}
+
+
+class InventoryItem(NamedTuple):
+    asset: str
+    serial: str
+    description: str
+
+
+class PrefixIndex:
+    """
+    Case-insensitive exact and prefix lookup over a sorted key array.
+    add_many() swaps in a new key list rather than sorting in place, so
+    lookups on other threads need no lock.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._items: Dict[str, InventoryItem] = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add_many(self, pairs):
+        new_keys = []
+        for key, item in pairs:
+            key = key.upper()
+            if not key:
+                continue
+            if key not in self._items:
+                new_keys.append(key)
+            self._items[key] = item  # later rows win
+        if new_keys:
+            new_keys.sort()
+            # two sorted runs: timsort merges them in linear time
+            keys = self._keys + new_keys
+            keys.sort()
+            self._keys = keys
+
+    def get(self, key: str) -> Optional[InventoryItem]:
+        return self._items.get((key or "").strip().upper())
+
+    def prefix(self, prefix: str, limit: int = 8) -> List[InventoryItem]:
+        prefix = (prefix or "").strip().upper()
+        if not prefix:
+            return []
+        keys = self._keys
+        out = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and len(out) < limit and keys[i].startswith(prefix):
+            out.append(self._items[keys[i]])
+            i += 1
+        return out
+
+
+class Inventory:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.by_asset = PrefixIndex()
+        self.by_serial = PrefixIndex()
+        self._mtime_ns = None
+        self._offset = 0        # end of the last fully parsed line
+        self._header = None
+        self._digest = hashlib.sha256()     # of the bytes up to _offset
+        self._lock = threading.Lock()
+
+    # ---------- loading ----------
+    def _reset(self):
+        self._offset = 0
+        self._header = None
+        self._digest = hashlib.sha256()
+
+    def _column_map(self, header):
+        lowered = [h.strip().lower() for h in header]
+        cols = {}
+        for field, names in _COLUMNS.items():
+            for name in names:
+                if name in lowered:
+                    cols[field] = lowered.index(name)
+                    break
+        if "asset" not in cols and "serial" not in cols:
+            raise ValueError(f"{self.path}: inventory needs an ASSET No or SERIAL No column")
+        return cols
+
+    def _parse_from(self, f, by_asset: PrefixIndex, by_serial: PrefixIndex):
+        """Parse complete lines from the current offset; a trailing partial line is left for next time."""
+        f.seek(self._offset)
+        chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return
+        text = chunk[:end].decode("utf-8-sig" if self._offset == 0 else "utf-8")
+        reader = csv.reader(io.StringIO(text))
+
+        if self._header is None:
+            self._header = self._column_map(next(reader, []))
+        cols = self._header
+
+        def cell(row, field):
+            idx = cols.get(field)
+            return row[idx].strip() if idx is not None and idx < len(row) else ""
+
+        items = []
+        for row in reader:
+            if not row:
+                continue
+            items.append(InventoryItem(cell(row, "asset"), cell(row, "serial"), cell(row, "description")))
+
+        by_asset.add_many((it.asset, it) for it in items)
+        by_serial.add_many((it.serial, it) for it in items)
+
+        self._digest.update(chunk[:end])
+        self._offset += end
+
+    def _parsed_part_unchanged(self, f) -> bool:
+        """Whether the first _offset bytes on disk still hash to what was parsed."""
+        f.seek(0)
+        digest = hashlib.sha256()
+        remaining = self._offset
+        while remaining:
+            block = f.read(min(remaining, 1024 * 1024))
+            if not block:
+                return False
+            digest.update(block)
+            remaining -= len(block)
+        return digest.digest() == self._digest.digest()
+
+    def refresh(self):
+        """Pick up changes on disk (cheap stat when nothing changed)."""
+        with self._lock:
+            try:
+                st = self.path.stat()
+            except FileNotFoundError:
+                self._reset()
+                self.by_asset, self.by_serial = PrefixIndex(), PrefixIndex()
+                self._mtime_ns = None
+                return
+            if st.st_mtime_ns == self._mtime_ns:
+                return
+
+            with self.path.open("rb") as f:
+                if self._offset and st.st_size >= self._offset and self._parsed_part_unchanged(f):
+                    self._parse_from(f, self.by_asset, self.by_serial)
+                else:
+                    # full reload into new indexes; lookups keep the old ones until the swap
+                    self._reset()
+                    by_asset, by_serial = PrefixIndex(), PrefixIndex()
+                    self._parse_from(f, by_asset, by_serial)
+                    self.by_asset, self.by_serial = by_asset, by_serial
+            self._mtime_ns = st.st_mtime_ns
+
+    # ---------- lookups ----------
+    def lookup_asset(self, asset: str) -> Optional[InventoryItem]:
+        return self.by_asset.get(asset)
+
+    def lookup_serial(self, serial: str) -> Optional[InventoryItem]:
+        return self.by_serial.get(serial)
+
+    def suggest_assets(self, prefix: str, limit: int = 8) -> List[InventoryItem]:
+        return self.by_asset.prefix(prefix, limit)
+
+    def suggest_serials(self, prefix: str, limit: int = 8) -> List[InventoryItem]:
+        return self.by_serial.prefix(prefix, limit)
+
+
+_inventories: Dict[str, Inventory] = {}
+_inventories_lock = threading.Lock()
+
+
+def get_inventory(path=DEFAULT_INVENTORY_PATH) -> Optional[Inventory]:
+    """Process-wide inventory for `path`, refreshed by mtime; None when the file doesn't exist."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    key = str(path.resolve())
+    with _inventories_lock:
+        inv = _inventories.get(key)
+        if inv is None:
+            inv = _inventories[key] = Inventory(path)
+    inv.refresh()
+    return inv
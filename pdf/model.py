@@ -0,0 +1,224 @@
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Mapping, Optional, Tuple
+
+# Rows that fit in the tables on page 1; anything beyond flows onto continuation pages.
+EQ_ROWS = 10
+RET_ROWS = 8
+
+_ROW_KEY = re.compile(r"^(eq|ret)_(?:desc|condition|serial|asset)_(\d+)$")
+
+DEFAULT_M365_DOMAIN = "statom.co.uk"
+DEFAULT_SHAREPOINT_URL = "https://statom.sharepoint.com"
+DEFAULT_HELPDESK_EMAIL = "helpdesk@statom.co.uk"
+
+
+def _s(v) -> str:
+    return "" if v is None else str(v).strip()
+
+
+def _fmt_date(v) -> str:
+    if isinstance(v, (date, datetime)):
+        return v.strftime("%Y-%m-%d")
+    return _s(v)
+
+
+def safe_filename(s: str) -> str:
+    s = (s or "").strip()
+    s = re.sub(r"[^\w\-. ]+", "", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s or "export"
+
+
+def unique_filename(filename: str, used: set) -> str:
+    """
+    Suffix " (2)", " (3)", ... when two forms would export under the same name.
+    `used` holds the lower-cased names handed out so far and is updated in place.
+    """
+    stem, dot, ext = filename.rpartition(".")
+    if not dot:
+        stem, ext = filename, ""
+    candidate, n = filename, 2
+    while candidate.lower() in used:
+        candidate = f"{stem} ({n}){dot}{ext}"
+        n += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def row_counts(state: Mapping) -> Tuple[int, int]:
+    """Number of issued / returned rows present in flat state (highest eq_*_N / ret_*_N index + 1)."""
+    counts = {"eq": 0, "ret": 0}
+    for k in state.keys():
+        m = _ROW_KEY.match(k) if isinstance(k, str) else None
+        if m:
+            prefix, n = m.group(1), int(m.group(2)) + 1
+            if n > counts[prefix]:
+                counts[prefix] = n
+    return counts["eq"], counts["ret"]
+
+
+def _trim(rows) -> tuple:
+    # drop trailing empty rows so the PDF only flows onto extra pages for real data
+    rows = list(rows)
+    while rows and rows[-1].is_empty():
+        rows.pop()
+    return tuple(rows)
+
+
+def m365_email(state: Mapping) -> str:
+    """
+    Builds email from base + selected domain.
+    If m365_username already contains '@', use it as-is.
+    """
+    existing = _s(state.get("m365_username"))
+    if "@" in existing:
+        return existing
+
+    base = _s(state.get("m365_user_base"))
+    domain = _s(state.get("m365_domain")) or DEFAULT_M365_DOMAIN
+    if not base:
+        return ""
+    return f"{base}@{domain}"
+
+
+# ---------- records ----------
+@dataclass(frozen=True, slots=True)
+class Personnel:
+    name: str = ""
+    date: str = ""              # YYYY-MM-DD
+    work_location: str = ""
+    issuer_name: str = ""
+    receiver_name: str = ""
+    return_issuer: str = ""
+    return_receiver: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class EquipmentRow:
+    description: str = ""
+    condition: str = ""         # condition at issue / returned condition
+    serial: str = ""
+    asset: str = ""
+
+    def is_empty(self) -> bool:
+        return not (self.description or self.condition or self.serial or self.asset)
+
+
+@dataclass(frozen=True, slots=True)
+class ExtraAccount:
+    software: str = ""
+    account: str = ""
+    password: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class Accounts:
+    starter_full_name: str = ""
+    starter_role: str = ""
+    starter_instructions: str = ""
+    laptop_username: str = ""
+    laptop_password: str = ""
+    m365_email: str = ""
+    m365_password: str = ""
+    m365_2fa: bool = False
+    sharepoint_url: str = DEFAULT_SHAREPOINT_URL
+    helpdesk_email: str = DEFAULT_HELPDESK_EMAIL
+    extra: Tuple[ExtraAccount, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class EquipmentIssueForm:
+    """
+    Everything the PDF renderer needs, with no Streamlit dependency.
+    Frozen and hashable, so a record can be used directly as a cache key.
+    """
+    personnel: Personnel = field(default_factory=Personnel)
+    equipment: Tuple[EquipmentRow, ...] = ()
+    returned: Tuple[EquipmentRow, ...] = ()
+    accounts: Accounts = field(default_factory=Accounts)
+    logo_path: str = ""
+
+    def first_asset_number(self) -> str:
+        for r in self.equipment:
+            if r.asset:
+                return r.asset
+        return ""
+
+    def export_filename(self) -> str:
+        # "Name - Asset.pdf", or "Name.pdf" when no asset number was entered
+        person_name = safe_filename(self.personnel.name)
+        asset_no = self.first_asset_number()
+        if asset_no:
+            return f"{person_name} - {safe_filename(asset_no)}.pdf"
+        return f"{person_name}.pdf"
+
+    @classmethod
+    def from_state(cls, state: Mapping, logo_path: Optional[str] = None) -> "EquipmentIssueForm":
+        """
+        Build a record from flat, session-state shaped keys
+        (name, eq_desc_0, ret_serial_3, laptop_password, extra_accounts, ...).
+        """
+        personnel = Personnel(
+            name=_s(state.get("name")),
+            date=_fmt_date(state.get("date")),
+            work_location=_s(state.get("work_location")),
+            issuer_name=_s(state.get("issuer_name")),
+            receiver_name=_s(state.get("receiver_name")),
+            return_issuer=_s(state.get("return_issuer")),
+            return_receiver=_s(state.get("return_receiver")),
+        )
+
+        eq_count, ret_count = row_counts(state)
+        equipment = _trim(
+            EquipmentRow(
+                description=_s(state.get(f"eq_desc_{i}")),
+                condition=_s(state.get(f"eq_condition_{i}")),
+                serial=_s(state.get(f"eq_serial_{i}")),
+                asset=_s(state.get(f"eq_asset_{i}")),
+            )
+            for i in range(eq_count)
+        )
+        returned = _trim(
+            EquipmentRow(
+                description=_s(state.get(f"ret_desc_{i}")),
+                condition=_s(state.get(f"ret_condition_{i}")),
+                serial=_s(state.get(f"ret_serial_{i}")),
+                asset=_s(state.get(f"ret_asset_{i}")),
+            )
+            for i in range(ret_count)
+        )
+
+        extra = []
+        for r in state.get("extra_accounts") or []:
+            r = r or {}
+            acc = ExtraAccount(
+                software=_s(r.get("Software")),
+                account=_s(r.get("Account")),
+                password=_s(r.get("Password")),
+            )
+            if acc.software or acc.account or acc.password:
+                extra.append(acc)
+
+        accounts = Accounts(
+            starter_full_name=_s(state.get("starter_full_name")),
+            starter_role=_s(state.get("starter_role")),
+            starter_instructions=_s(state.get("starter_instructions")),
+            laptop_username=_s(state.get("laptop_username")),
+            laptop_password=_s(state.get("laptop_password")),
+            m365_email=m365_email(state),
+            m365_password=_s(state.get("m365_password")),
+            m365_2fa=bool(state.get("m365_2fa", False)),
+            sharepoint_url=_s(state.get("sharepoint_url", DEFAULT_SHAREPOINT_URL)),
+            helpdesk_email=_s(state.get("helpdesk_email", DEFAULT_HELPDESK_EMAIL)),
+            extra=tuple(extra),
+        )
+
+        return cls(
+            personnel=personnel,
+            equipment=equipment,
+            returned=returned,
+            accounts=accounts,
+            logo_path=_s(logo_path),
+        )
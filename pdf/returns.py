@@ -0,0 +1,80 @@
+"""
+Return leg of a form, written onto the issued PDF as an incremental update.
+
+The issued file's bytes are kept as they are; the return section (returned
+rows and the return sign-off) is appended after them as a new revision:
+
+  * page 1's original content is wrapped in q/Q and the return fields are
+    drawn after it (PageObject.merge_page), so the issue record itself is
+    never rewritten. The overlay whites out the return cells first, so
+    return values printed at issue time don't show through;
+  * returned rows past RET_ROWS go onto new continuation pages at the end.
+
+The update is a few KB however large the issued file is, and the original
+revision can still be recovered by truncating at its length. Page 1 of a
+return revision records that length (/EquipmentReturn), so returning a form
+again replaces the earlier return instead of printing over it.
+"""
+from io import BytesIO
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PdfReadError
+from pypdf.generic import NameObject, NumberObject
+
+from pdf.generator import render_return_overlay
+from pdf.model import EquipmentIssueForm
+
+RETURN_MARK = NameObject("/EquipmentReturn")   # on page 1: byte length of the issue revision underneath
+
+
+def _reader(data: bytes) -> PdfReader:
+    try:
+        reader = PdfReader(BytesIO(data))
+        if not len(reader.pages):
+            raise ValueError("PDF has no pages")
+    except PdfReadError as e:
+        raise ValueError(f"not a readable PDF: {e}") from None
+    return reader
+
+
+def issue_revision(pdf: bytes) -> bytes:
+    """`pdf` without an earlier return revision (as is when it has none). Raises ValueError if unreadable."""
+    mark = _reader(pdf).pages[0].get(RETURN_MARK)
+    if mark is None:
+        return pdf
+    length = int(mark)
+    base = pdf[:length] if 0 < length < len(pdf) else b""
+    if not base.rstrip().endswith(b"%%EOF"):
+        raise ValueError("the PDF's earlier return section is damaged; upload the issued PDF instead")
+    if RETURN_MARK in _reader(base).pages[0]:
+        raise ValueError("the PDF's earlier return section is damaged; upload the issued PDF instead")
+    return base
+
+
+def append_return(issued_pdf: bytes, form: EquipmentIssueForm) -> bytes:
+    """
+    Issued PDF + form's return section -> the updated PDF, which starts with
+    the issue revision of `issued_pdf` byte for byte (any earlier return is
+    replaced). Raises ValueError if `issued_pdf` isn't a readable PDF.
+    """
+    base = issue_revision(issued_pdf)
+    writer = PdfWriter(BytesIO(base), incremental=True)
+
+    overlay = PdfReader(BytesIO(render_return_overlay(form)))
+    first = writer.pages[0]
+    first.merge_page(overlay.pages[0])    # also brings over the overlay's fonts
+    first[RETURN_MARK] = NumberObject(len(base))
+
+    for page in overlay.pages[1:]:
+        writer.add_page(page)
+
+    out = BytesIO()
+    writer.write(out)
+    updated = out.getvalue()
+    if not updated.startswith(base):
+        raise RuntimeError("incremental update rewrote the issued revision")
+    try:
+        _reader(updated).pages[0].get_contents()
+    except (ValueError, PdfReadError) as e:
+        raise RuntimeError(f"incremental update produced an unreadable PDF: {e}") from None
+    return updated
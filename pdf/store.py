@@ -0,0 +1,342 @@
+"""
+Local SQLite record of every exported form.
+
+One `personnel` row per form, with its issued and returned rows in
+`issued_equipment` / `returned_equipment` (the return leg is recorded
+later against the same row, see record_return). A form is identified by
+the starter's name and issue date (form_key): exporting it again after an
+edit replaces its row and equipment rows, so lookups never see the stale
+copy. Receiver name, issue date, SERIAL No and ASSET No are indexed.
+Passwords and account details are never stored.
+
+    python -m pdf.store asset AST-2001      # who has / had this asset?
+    python -m pdf.store serial SN1001
+    python -m pdf.store person "Jack Smith"
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from pdf.model import EquipmentIssueForm, EquipmentRow, Personnel
+
+log = logging.getLogger("equipment_form.store")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DB_PATH = Path(os.environ.get("EQUIPMENT_FORM_DB", PROJECT_ROOT / "data" / "forms.sqlite3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS personnel (
+    id              INTEGER PRIMARY KEY,
+    form_key        TEXT NOT NULL,
+    form_hash       TEXT NOT NULL,
+    name            TEXT NOT NULL,
+    issue_date      TEXT NOT NULL,
+    work_location   TEXT NOT NULL,
+    issuer_name     TEXT NOT NULL,
+    receiver_name   TEXT NOT NULL,
+    return_issuer   TEXT NOT NULL,
+    return_receiver TEXT NOT NULL,
+    logo            TEXT NOT NULL,
+    exported_at     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS issued_equipment (
+    form_id     INTEGER NOT NULL REFERENCES personnel(id) ON DELETE CASCADE,
+    row_no      INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    condition   TEXT NOT NULL,
+    serial      TEXT NOT NULL,
+    asset       TEXT NOT NULL,
+    PRIMARY KEY (form_id, row_no)
+);
+CREATE TABLE IF NOT EXISTS returned_equipment (
+    form_id     INTEGER NOT NULL REFERENCES personnel(id) ON DELETE CASCADE,
+    row_no      INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    condition   TEXT NOT NULL,
+    serial      TEXT NOT NULL,
+    asset       TEXT NOT NULL,
+    PRIMARY KEY (form_id, row_no)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_personnel_form_key ON personnel (form_key);
+CREATE INDEX IF NOT EXISTS ix_personnel_receiver ON personnel (receiver_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_personnel_name ON personnel (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_personnel_date ON personnel (issue_date);
+CREATE INDEX IF NOT EXISTS ix_issued_serial ON issued_equipment (serial COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_issued_asset ON issued_equipment (asset COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_returned_serial ON returned_equipment (serial COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_returned_asset ON returned_equipment (asset COLLATE NOCASE);
+"""
+
+_LOOKUP_SQL = """
+SELECT p.id AS form_id, p.name, p.receiver_name, p.issue_date, p.work_location, p.exported_at,
+       e.description, e.serial, e.asset, e.condition,
+       EXISTS (
+           SELECT 1 FROM returned_equipment r
+           WHERE r.form_id = p.id
+             AND ((e.asset != '' AND r.asset = e.asset COLLATE NOCASE)
+               OR (e.serial != '' AND r.serial = e.serial COLLATE NOCASE))
+       ) AS returned
+FROM issued_equipment e
+JOIN personnel p ON p.id = e.form_id
+WHERE {where}
+ORDER BY p.issue_date DESC, p.id DESC
+"""
+
+
+def _key(name: str, issue_date: str) -> str:
+    return f"{(name or '').strip().casefold()}|{(issue_date or '').strip()}"
+
+
+def form_key(form: EquipmentIssueForm) -> str:
+    """Identity of a form across edits and re-exports: starter name (case-insensitive) and issue date."""
+    return _key(form.personnel.name, form.personnel.date)
+
+
+def form_hash(form: EquipmentIssueForm) -> str:
+    """Stable hash of the stored (non-secret) part of a form, used to skip unchanged re-exports."""
+    payload = {
+        "personnel": asdict(form.personnel),
+        "equipment": [asdict(r) for r in form.equipment if not r.is_empty()],
+        "returned": [asdict(r) for r in form.returned if not r.is_empty()],
+        "logo": Path(form.logo_path).name if form.logo_path else "",
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class FormStore:
+    """Thin synchronous wrapper over the SQLite file; one connection per call/thread."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._add_form_key(conn)
+            conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _add_form_key(conn):
+        """Databases from before form_key: add it, keeping only the newest export of each form."""
+        columns = [r["name"] for r in conn.execute("PRAGMA table_info(personnel)")]
+        if not columns or "form_key" in columns:
+            return
+        conn.execute("ALTER TABLE personnel ADD COLUMN form_key TEXT NOT NULL DEFAULT ''")
+        newest = {}
+        for r in conn.execute("SELECT id, name, issue_date FROM personnel ORDER BY id"):
+            key = _key(r["name"], r["issue_date"])
+            if key in newest:
+                conn.execute("DELETE FROM personnel WHERE id = ?", (newest[key],))
+            newest[key] = r["id"]
+            conn.execute("UPDATE personnel SET form_key = ? WHERE id = ?", (key, r["id"]))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    # ---------- writes ----------
+    def save(self, form: EquipmentIssueForm, conn: Optional[sqlite3.Connection] = None) -> Optional[int]:
+        """
+        Insert one form, or replace the stored copy of the same form (form_key);
+        returns its id, or None if the stored copy is identical.
+        """
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            with conn:
+                return self._insert(conn, form)
+        finally:
+            if own:
+                conn.close()
+
+    def _insert(self, conn, form: EquipmentIssueForm) -> Optional[int]:
+        p = form.personnel
+        key, digest = form_key(form), form_hash(form)
+        stored = conn.execute("SELECT id, form_hash FROM personnel WHERE form_key = ?", (key,)).fetchone()
+        if stored is not None and stored["form_hash"] == digest:
+            return None
+
+        values = (
+            digest, p.name, p.date, p.work_location, p.issuer_name,
+            p.receiver_name, p.return_issuer, p.return_receiver,
+            Path(form.logo_path).name if form.logo_path else "",
+            datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        if stored is None:
+            cur = conn.execute(
+                "INSERT INTO personnel (form_key, form_hash, name, issue_date, work_location, issuer_name,"
+                " receiver_name, return_issuer, return_receiver, logo, exported_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key,) + values,
+            )
+            form_id = cur.lastrowid
+        else:
+            form_id = stored["id"]
+            conn.execute(
+                "UPDATE personnel SET form_hash = ?, name = ?, issue_date = ?, work_location = ?,"
+                " issuer_name = ?, receiver_name = ?, return_issuer = ?, return_receiver = ?,"
+                " logo = ?, exported_at = ? WHERE id = ?",
+                values + (form_id,),
+            )
+            conn.execute("DELETE FROM issued_equipment WHERE form_id = ?", (form_id,))
+            conn.execute("DELETE FROM returned_equipment WHERE form_id = ?", (form_id,))
+
+        for table, rows in (("issued_equipment", form.equipment), ("returned_equipment", form.returned)):
+            conn.executemany(
+                f"INSERT INTO {table} (form_id, row_no, description, condition, serial, asset)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (form_id, i, r.description, r.condition, r.serial, r.asset)
+                    for i, r in enumerate(rows)
+                    if not r.is_empty()
+                ],
+            )
+        return form_id
+
+    def record_return(self, form_id: int, form: EquipmentIssueForm):
+        """Store the return leg of an issued form: its returned rows and return sign-off (replacing any earlier one)."""
+        p = form.personnel
+        with closing(self._connect()) as conn, conn:
+            cur = conn.execute(
+                "UPDATE personnel SET return_issuer = ?, return_receiver = ? WHERE id = ?",
+                (p.return_issuer, p.return_receiver, form_id),
+            )
+            if cur.rowcount == 0:
+                raise KeyError(form_id)
+            conn.execute("DELETE FROM returned_equipment WHERE form_id = ?", (form_id,))
+            conn.executemany(
+                "INSERT INTO returned_equipment (form_id, row_no, description, condition, serial, asset)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (form_id, i, r.description, r.condition, r.serial, r.asset)
+                    for i, r in enumerate(form.returned)
+                    if not r.is_empty()
+                ],
+            )
+
+    # ---------- lookups ----------
+    def load(self, form_id: int) -> EquipmentIssueForm:
+        """
+        A stored form, ready for its return leg: personnel and issued rows, with the
+        returned rows prefilled from the issued ones (condition left blank).
+        Raises KeyError for an unknown id.
+        """
+        with closing(self._connect()) as conn, conn:
+            p = conn.execute("SELECT * FROM personnel WHERE id = ?", (form_id,)).fetchone()
+            if p is None:
+                raise KeyError(form_id)
+            rows = conn.execute(
+                "SELECT description, condition, serial, asset FROM issued_equipment"
+                " WHERE form_id = ? ORDER BY row_no",
+                (form_id,),
+            ).fetchall()
+
+        equipment = tuple(EquipmentRow(**dict(r)) for r in rows)
+        return EquipmentIssueForm(
+            personnel=Personnel(
+                name=p["name"], date=p["issue_date"], work_location=p["work_location"],
+                issuer_name=p["issuer_name"], receiver_name=p["receiver_name"],
+                return_issuer=p["return_issuer"], return_receiver=p["return_receiver"],
+            ),
+            equipment=equipment,
+            returned=tuple(EquipmentRow(r.description, "", r.serial, r.asset) for r in equipment),
+        )
+
+    def _lookup(self, where: str, value: str) -> List[dict]:
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(_LOOKUP_SQL.format(where=where), (value.strip(),)).fetchall()
+        return [dict(r) for r in rows]
+
+    def find_by_asset(self, asset: str) -> List[dict]:
+        """Issued rows carrying this ASSET No, newest first, with a `returned` flag."""
+        return self._lookup("e.asset = ? COLLATE NOCASE", asset)
+
+    def find_by_serial(self, serial: str) -> List[dict]:
+        return self._lookup("e.serial = ? COLLATE NOCASE", serial)
+
+    def find_by_person(self, name: str) -> List[dict]:
+        return self._lookup("p.receiver_name = ? COLLATE NOCASE", name)
+
+
+class StoreWriter:
+    """
+    Single background thread that owns the write connection.
+    submit() only enqueues, so an export never waits on disk I/O.
+    """
+
+    def __init__(self, store: FormStore):
+        self.store = store
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="form-store-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, form: EquipmentIssueForm):
+        self._queue.put(form)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until everything submitted so far is written (tests / shutdown)."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self):
+        conn = self.store._connect()
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                with conn:
+                    self.store._insert(conn, item)
+            except Exception:
+                log.exception("failed to record exported form")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer(path=DEFAULT_DB_PATH) -> StoreWriter:
+    """Process-wide writer (created on first export)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = StoreWriter(FormStore(path))
+        return _writer
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Look up exported equipment issue forms.")
+    ap.add_argument("by", choices=("asset", "serial", "person"))
+    ap.add_argument("value")
+    ap.add_argument("--db", type=Path, default=DEFAULT_DB_PATH)
+    args = ap.parse_args(argv)
+
+    store = FormStore(args.db)
+    finder = {"asset": store.find_by_asset, "serial": store.find_by_serial, "person": store.find_by_person}[args.by]
+    rows = finder(args.value)
+    for r in rows:
+        status = "returned" if r["returned"] else "issued"
+        print(f"{r['issue_date']}  {r['receiver_name'] or r['name']:24}  {r['asset']:12}  {r['serial']:14}  {r['description']}  ({status})")
+    if not rows:
+        print("no matches", file=sys.stderr)
+    return 0 if rows else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Measured text layout for the PDF renderer: wrap, ellipsize and shrink-to-fit.
+
+Widths come from reportlab's font metrics and are memoized per (font, size),
+both for single glyphs and for whole words, so laying out the same strings
+again (every export of a form, every form in a batch) costs dict lookups only.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+ELLIPSIS = "…"
+MIN_SIZE = 5        # smallest size shrink-to-fit goes down to before ellipsizing
+
+
+# ---------- widths ----------
+@lru_cache(maxsize=4096)
+def glyph_width(ch: str, font: str, size: float) -> float:
+    return stringWidth(ch, font, size)
+
+
+@lru_cache(maxsize=16384)
+def text_width(text: str, font: str, size: float) -> float:
+    """Width of a word or short string in points."""
+    return stringWidth(text, font, size)
+
+
+# ---------- layout ----------
+def ellipsize(text: str, font: str, size: float, max_w: float) -> str:
+    """`text` cut at a glyph boundary (with "…") so it fits in `max_w`."""
+    text = "" if text is None else str(text)
+    if text_width(text, font, size) <= max_w:
+        return text
+    budget = max_w - glyph_width(ELLIPSIS, font, size)
+    w, end = 0.0, 0
+    for ch in text:
+        w += glyph_width(ch, font, size)
+        if w > budget:
+            break
+        end += 1
+    return text[:end].rstrip() + ELLIPSIS if budget > 0 else ""
+
+
+def fit(text: str, font: str, size: float, max_w: float, min_size: float = MIN_SIZE) -> Tuple[str, float]:
+    """(text, size): shrink in half-point steps down to `min_size`, then ellipsize."""
+    text = "" if text is None else str(text)
+    w = text_width(text, font, size)
+    if w <= max_w:
+        return text, size
+    # width scales linearly with size, so the target can be computed directly
+    shrunk = max(min_size, int(size * max_w / w * 2) / 2)
+    return ellipsize(text, font, shrunk, max_w), shrunk
+
+
+def _break_word(word: str, font: str, size: float, max_w: float):
+    # a single word wider than the line is split at glyph boundaries
+    part, w = "", 0.0
+    for ch in word:
+        cw = glyph_width(ch, font, size)
+        if part and w + cw > max_w:
+            yield part
+            part, w = "", 0.0
+        part += ch
+        w += cw
+    if part:
+        yield part
+
+
+@lru_cache(maxsize=1024)
+def wrap(text: str, font: str, size: float, max_w: float, max_lines: int = 0) -> Tuple[str, ...]:
+    """
+    Greedy word wrap to `max_w`. With `max_lines`, the last kept line is
+    ellipsized when the text doesn't fit.
+    """
+    lines = []
+    space = glyph_width(" ", font, size)
+
+    for paragraph in (text or "").splitlines() or [""]:
+        line, line_w = "", 0.0
+        for word in paragraph.split():
+            ww = text_width(word, font, size)
+            if ww > max_w:
+                pieces = list(_break_word(word, font, size, max_w))
+            else:
+                pieces = [word]
+            for piece in pieces:
+                pw = ww if len(pieces) == 1 else text_width(piece, font, size)
+                if line and line_w + space + pw <= max_w:
+                    line, line_w = f"{line} {piece}", line_w + space + pw
+                    continue
+                if line:
+                    lines.append(line)
+                line, line_w = piece, pw
+        if line:
+            lines.append(line)
+
+    if max_lines and len(lines) > max_lines:
+        kept = list(lines[:max_lines])
+        kept[-1] = ellipsize(kept[-1] + ELLIPSIS, font, size, max_w)
+        return tuple(kept)
+    return tuple(lines)
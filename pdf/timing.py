@@ -0,0 +1,81 @@
+"""
+Named timing spans for the PDF renderer.
+
+    with timing.record() as spans:
+        pdf_bytes = render_equipment_issue_pdf(form)
+    spans.as_dict()   # {"issue.skeleton": 0.41, "issue.logo": 3.2, ..., "save": 6.9}
+
+Outside record() every span() is a shared no-op context manager, so the
+instrumented code pays one ContextVar lookup per section and nothing else.
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+log = logging.getLogger("equipment_form.pdf")
+
+# Opt-in switch for the app: EQUIPMENT_FORM_PROFILE=1
+ENABLED = os.environ.get("EQUIPMENT_FORM_PROFILE", "").strip().lower() in ("1", "true", "yes", "on")
+
+_NOOP = nullcontext()
+_current = ContextVar("pdf_spans", default=None)
+
+
+class _Span:
+    __slots__ = ("_spans", "_name", "_t0")
+
+    def __init__(self, spans, name):
+        self._spans = spans
+        self._name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._spans.add(self._name, (time.perf_counter() - self._t0) * 1000)
+        return False
+
+
+class Spans:
+    """Accumulated milliseconds per span name, in first-seen order."""
+
+    def __init__(self):
+        self._ms = {}
+        self.total_ms = 0.0
+
+    def add(self, name: str, ms: float):
+        self._ms[name] = self._ms.get(name, 0.0) + ms
+
+    def as_dict(self) -> dict:
+        return {k: round(v, 3) for k, v in self._ms.items()}
+
+
+def span(name: str):
+    spans = _current.get()
+    if spans is None:
+        return _NOOP
+    return _Span(spans, name)
+
+
+@contextmanager
+def record():
+    """Collect spans for everything rendered in this block (current thread/context only)."""
+    spans = Spans()
+    token = _current.set(spans)
+    t0 = time.perf_counter()
+    try:
+        yield spans
+    finally:
+        spans.total_ms = (time.perf_counter() - t0) * 1000
+        _current.reset(token)
+
+
+def log_export(spans: Spans, **fields):
+    """One structured (JSON) log line per export."""
+    payload = {"event": "pdf_export", "total_ms": round(spans.total_ms, 3), "spans": spans.as_dict()}
+    payload.update(fields)
+    log.info(json.dumps(payload, sort_keys=True))
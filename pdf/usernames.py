@@ -0,0 +1,245 @@
+"""
+Usernames and M365 addresses generated from a starter's name.
+
+    "Jack Smith"          -> jack.smith
+    "José García-López"   -> jose.garcialopez
+    "Łukasz Żółć"         -> lukasz.zolc
+    "Ольга Иванова"       -> olga.ivanova
+
+First and last word of the name, lower case, letters and digits only.
+Accents are dropped (NFKD), and letters without a decomposition (ß, ø,
+ł, æ, ...) and Greek / Cyrillic are transliterated, instead of being
+stripped. username() does one name for the form; assign_accounts() does a
+whole bulk file at once with vectorized string operations.
+
+In bulk, generated names are checked against each other and against an
+existing directory export (data/directory.csv, EQUIPMENT_DIRECTORY_CSV
+overrides): a UserPrincipalName / mail / SamAccountName / username column,
+matched case-insensitively. A taken name gets the first free numeric
+suffix (jack.smith2, jack.smith3, ...), in file order, so the same input
+always gives the same names. The directory is hashed into a set of local
+parts (before any "@") once per process, and re-read when its mtime changes.
+"""
+import csv
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Collection, Dict, FrozenSet, List, Optional, Sequence
+
+from pdf.model import DEFAULT_M365_DOMAIN
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DIRECTORY_PATH = Path(os.environ.get("EQUIPMENT_DIRECTORY_CSV", PROJECT_ROOT / "data" / "directory.csv"))
+
+_COLUMNS = (
+    "userprincipalname", "user principal name", "upn",
+    "mail", "email", "primarysmtpaddress",
+    "samaccountname", "username", "laptop_username",
+)
+
+# letters NFKD leaves alone (applied after lower())
+_TRANSLIT = str.maketrans({
+    # Latin
+    "ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "đ": "d", "ð": "d", "þ": "th", "ł": "l",
+    "ı": "i", "ħ": "h", "ŧ": "t", "ŋ": "n", "ĸ": "k", "ƒ": "f",
+    # Greek
+    "α": "a", "β": "v", "γ": "g", "δ": "d", "ε": "e", "ζ": "z", "η": "i", "θ": "th",
+    "ι": "i", "κ": "k", "λ": "l", "μ": "m", "ν": "n", "ξ": "x", "ο": "o", "π": "p",
+    "ρ": "r", "σ": "s", "ς": "s", "τ": "t", "υ": "y", "φ": "f", "χ": "ch", "ψ": "ps", "ω": "o",
+    # Cyrillic
+    "а": "a", "б": "b", "в": "v", "г": "g", "ґ": "g", "д": "d", "е": "e", "є": "ye",
+    "ж": "zh", "з": "z", "и": "i", "і": "i", "ј": "j", "к": "k", "л": "l", "љ": "lj",
+    "м": "m", "н": "n", "њ": "nj", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "ћ": "c", "ђ": "dj", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "џ": "dz",
+    "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+})
+_DIGRAPHS = (("ου", "ou"),)   # before _TRANSLIT
+_DROP = re.compile(r"[^a-z0-9\s]+")
+# "first middle last" -> "first.last"; a single word comes out as "word." (the dot is trimmed)
+_FIRST_LAST = (r"^(\S+)(?:.*\s(\S+))?$", r"\1.\2")
+
+
+# ---------- one name ----------
+def transliterate(text: str) -> str:
+    """Lower-case ASCII spelling of `text`: accents dropped, other letters spelled out."""
+    s = unicodedata.normalize("NFKD", (text or "").lower())
+    for pair in _DIGRAPHS:
+        s = s.replace(*pair)
+    return _strip_marks(s.translate(_TRANSLIT))
+
+
+def username(full_name: str) -> str:
+    """"Jack Smith" -> "jack.smith"; one word stays as it is; "" when nothing is left."""
+    parts = _DROP.sub("", transliterate(full_name)).split()
+    if not parts:
+        return ""
+    if len(parts) == 1:
+        return parts[0]
+    return f"{parts[0]}.{parts[-1]}"
+
+
+def _strip_marks(text: str) -> str:
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+# ---------- many names ----------
+def usernames(names: Sequence[str]):
+    """username() over a whole column at once; returns a pandas string Series (same order)."""
+    import pandas as pd  # bulk only; keeps pandas out of the app's startup
+
+    s = pd.Series(list(names), dtype="string").fillna("").str.lower()
+    # the per-character work only runs on the names that need it
+    unicode_rows = ~s.str.isascii()
+    if unicode_rows.any():
+        u = s[unicode_rows].str.normalize("NFKD")
+        for pair in _DIGRAPHS:
+            u = u.str.replace(*pair, regex=False)
+        u = u.str.translate(_TRANSLIT)
+        s.loc[unicode_rows] = u.map(_strip_marks)
+    s = s.str.replace(_DROP.pattern, "", regex=True).str.strip()
+    return s.str.replace(*_FIRST_LAST, regex=True).str.rstrip(".")
+
+
+def resolve_collisions(bases, taken: Collection[str] = ()) -> List[str]:
+    """
+    Make every non-empty name unique, and not in `taken`, with the first free
+    numeric suffix. The first occurrence of a name that isn't taken keeps it;
+    later ones are suffixed in input order.
+    """
+    import pandas as pd
+
+    bases = pd.Series(list(bases), dtype="string").fillna("")
+    blank = bases == ""
+    clash = (bases.isin(list(taken)) | bases.duplicated(keep="first")) & ~blank
+    out = bases.tolist()
+    if not clash.any():
+        return out
+
+    # names that stay as they are can't be handed out as a suffixed one either
+    used = set(taken)
+    used.update(bases[~clash & ~blank].tolist())
+    next_suffix: Dict[str, int] = {}
+    for i in clash[clash].index:
+        base = out[i]
+        n = next_suffix.get(base, 2)
+        while f"{base}{n}" in used:
+            n += 1
+        out[i] = f"{base}{n}"
+        used.add(out[i])
+        next_suffix[base] = n + 1
+    return out
+
+
+def _local_part(value) -> str:
+    value = str(value or "").strip().lower()
+    return value.rsplit("\\", 1)[-1].split("@", 1)[0]
+
+
+def assign_accounts(records: List[dict], directory: Optional["Directory"] = None) -> List[dict]:
+    """
+    Fill laptop_username, domain_username, m365_user_base and m365_username
+    where a bulk record leaves them blank. A record that sets any of them
+    keeps that name for the rest; the others get one generated from
+    starter_full_name (or name). Names records set are reserved like the
+    directory's. `records` are updated in place (and returned).
+    """
+    if not records:
+        return records
+    import pandas as pd
+
+    def column(key):
+        return pd.Series([str(r.get(key) or "").strip() for r in records], dtype="string")
+
+    own = column("laptop_username")
+    for key in ("m365_user_base", "m365_username"):
+        own = own.where(own != "", column(key).str.replace(r"@.*$", "", regex=True))
+    own = own.str.lower()
+    needed = own == ""
+
+    taken = set(directory.names) if directory is not None else set()
+    taken.update(own[~needed].tolist())
+
+    users = own.copy()
+    if needed.any():
+        names = column("starter_full_name")
+        names = names.where(names != "", column("name"))
+        users.loc[needed] = resolve_collisions(usernames(names[needed]), taken)
+
+    bases = column("m365_user_base")
+    bases = bases.where(bases != "", users)
+    domains = column("m365_domain").replace("", DEFAULT_M365_DOMAIN)
+    addresses = (bases + "@" + domains).where(bases != "", "")
+
+    for r, user, address in zip(records, users.tolist(), addresses.tolist()):
+        if not user:
+            continue
+        for key in ("laptop_username", "domain_username", "m365_user_base"):
+            if not str(r.get(key) or "").strip():
+                r[key] = user
+        if "@" not in str(r.get("m365_username") or ""):
+            r["m365_username"] = address
+    return records
+
+
+# ---------- directory export ----------
+class Directory:
+    """Existing account names from a directory export CSV, as a set of lower-case local parts."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.names: FrozenSet[str] = frozenset()
+        self._mtime_ns = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return (name or "").lower() in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def _load(self) -> FrozenSet[str]:
+        with self.path.open(encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = [h.strip().lower() for h in next(reader, [])]
+            cols = [i for i, h in enumerate(header) if h in _COLUMNS]
+            if not cols:
+                raise ValueError(f"{self.path}: directory export needs a UserPrincipalName, mail or SamAccountName column")
+            names = set()
+            for row in reader:
+                for i in cols:
+                    if i < len(row) and row[i].strip():
+                        names.add(_local_part(row[i]))
+        names.discard("")
+        return frozenset(names)
+
+    def refresh(self):
+        """Re-read the export if it changed on disk (cheap stat otherwise)."""
+        with self._lock:
+            try:
+                mtime_ns = self.path.stat().st_mtime_ns
+            except FileNotFoundError:
+                self.names, self._mtime_ns = frozenset(), None
+                return
+            if mtime_ns != self._mtime_ns:
+                self.names = self._load()
+                self._mtime_ns = mtime_ns
+
+
+_directories: Dict[str, Directory] = {}
+_directories_lock = threading.Lock()
+
+
+def get_directory(path=DEFAULT_DIRECTORY_PATH) -> Optional[Directory]:
+    """Process-wide directory index for `path`, refreshed by mtime; None when the file doesn't exist."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    key = str(path.resolve())
+    with _directories_lock:
+        d = _directories.get(key)
+        if d is None:
+            d = _directories[key] = Directory(path)
+    d.refresh()
+    return d
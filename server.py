@@ -0,0 +1,302 @@
+"""
+Local HTTP service that renders equipment issue PDFs from JSON.
+
+    python server.py                          # http://127.0.0.1:8502
+    python server.py --port 9000 --workers 4
+
+    POST /render[?size=archive]   body: one form record as JSON -> application/pdf
+                                  (byte-identical for identical records; ETag / X-Content-SHA256 carry its hash)
+    GET  /healthz                 -> "ok"
+    GET  /metrics                 -> request counts and latency histograms (Prometheus text format)
+
+The record uses the same keys as the Streamlit form and the bulk importer
+(see pdf/bulk.py): name, date, eq_desc_0, ..., or nested `equipment` lists.
+Rendering runs in a process pool; connections are HTTP/1.1 keep-alive.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from pdf.bulk import record_to_form
+from pdf.companies import get_companies
+from pdf.generator import PROFILES, render_pdf
+from pdf.usernames import transliterate
+
+log = logging.getLogger("equipment_form.server")
+
+MAX_BODY_BYTES = 256 * 1024
+QUEUE_PER_WORKER = 4    # renders allowed to wait per worker before new ones get 503
+IDLE_TIMEOUT = 30       # seconds a keep-alive connection may sit idle
+
+# seconds; Prometheus-style cumulative buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+# ---------- worker ----------
+def _render(record: dict, default_logo: str, size: str):
+    form = record_to_form(record, default_logo)
+    return form.export_filename(), render_pdf(form, size=size)
+
+
+def _warm(_):
+    # imports, font setup and every company logo happen once per worker, before the first request
+    get_companies().warm()
+    return os.getpid()
+
+
+def content_disposition(filename: str) -> str:
+    """
+    attachment header for any file name. send_header() only takes Latin-1, so
+    the name goes out as an ASCII fallback plus the UTF-8 original (RFC 6266 / 5987).
+    """
+    fallback = "".join(
+        ch if ch.isascii() else (transliterate(ch).capitalize() if ch.isupper() else transliterate(ch))
+        for ch in filename
+    )
+    fallback = re.sub(r'[^\x20-\x7e]|["\\]', "", fallback).strip()
+    if not fallback.rpartition(".")[0].strip(" -"):
+        fallback = "form.pdf"   # nothing left of the name in ASCII
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+# ---------- metrics ----------
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}     # (path, status) -> count
+        self._latency = {}      # path -> Histogram
+        self.in_flight = 0
+
+    def render_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def render_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def observe(self, path: str, status: int, seconds: float):
+        with self._lock:
+            key = (path, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            hist = self._latency.get(path)
+            if hist is None:
+                hist = self._latency[path] = Histogram()
+            hist.observe(seconds)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP equipment_form_requests_total HTTP requests by path and status.",
+                "# TYPE equipment_form_requests_total counter",
+            ]
+            for (path, status), n in sorted(self._requests.items()):
+                lines.append(f'equipment_form_requests_total{{path="{path}",status="{status}"}} {n}')
+
+            lines += [
+                "# HELP equipment_form_request_seconds Request latency by path.",
+                "# TYPE equipment_form_request_seconds histogram",
+            ]
+            for path, hist in sorted(self._latency.items()):
+                cumulative = 0
+                for le, n in zip(hist.buckets + ("+Inf",), hist.counts):
+                    cumulative += n
+                    lines.append(f'equipment_form_request_seconds_bucket{{path="{path}",le="{le}"}} {cumulative}')
+                lines.append(f'equipment_form_request_seconds_sum{{path="{path}"}} {hist.sum:.6f}')
+                lines.append(f'equipment_form_request_seconds_count{{path="{path}"}} {hist.count}')
+
+            lines += [
+                "# HELP equipment_form_renders_in_flight Renders queued or running.",
+                "# TYPE equipment_form_renders_in_flight gauge",
+                f"equipment_form_renders_in_flight {self.in_flight}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+# ---------- HTTP ----------
+class RenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, workers: int, default_logo: str):
+        super().__init__(address, RenderHandler)
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(workers * QUEUE_PER_WORKER)
+        self.default_logo = default_logo
+        self.metrics = Metrics()
+        list(self.pool.map(_warm, range(workers)))
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive unless the client says otherwise
+    timeout = IDLE_TIMEOUT
+    server: RenderServer
+
+    def log_message(self, fmt, *args):
+        log.debug("%s - %s", self.address_string(), fmt % args)
+
+    # ---------- responses ----------
+    def _send(self, status: int, body: bytes, content_type: str, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        self._status = int(status)
+
+    def _error(self, status: int, message: str):
+        body = json.dumps({"error": message}).encode("utf-8")
+        self._send(status, body, "application/json")
+
+    def _timed(self, route):
+        self._status = 500
+        started = time.perf_counter()
+        path = urlsplit(self.path).path
+        try:
+            route()
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        finally:
+            label = path if path in ("/render", "/metrics", "/healthz") else "other"
+            self.server.metrics.observe(label, self._status, time.perf_counter() - started)
+
+    # ---------- routes ----------
+    def do_GET(self):
+        self._timed(self._route_get)
+
+    def do_POST(self):
+        self._timed(self._route_post)
+
+    def _route_get(self):
+        path = urlsplit(self.path).path
+        if path == "/healthz":
+            self._send(200, b"ok\n", "text/plain; charset=utf-8")
+        elif path == "/metrics":
+            self._send(200, self.server.metrics.render().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._error(404, "not found")
+
+    def _read_body(self):
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True
+            self._error(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+            return None
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._error(400, "bad Content-Length")
+            return None
+        if length > MAX_BODY_BYTES:
+            # don't read (or keep) a connection carrying an oversized body
+            self.close_connection = True
+            self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body larger than {MAX_BODY_BYTES} bytes")
+            return None
+        return self.rfile.read(length)
+
+    def _route_post(self):
+        url = urlsplit(self.path)
+        if url.path != "/render":
+            self._error(404, "not found")
+            return
+
+        body = self._read_body()
+        if body is None:
+            return
+
+        size = (parse_qs(url.query).get("size") or ["print"])[0]
+        if size not in PROFILES:
+            self._error(400, f"unknown size {size!r}")
+            return
+
+        try:
+            record = json.loads(body)
+        except ValueError as e:
+            self._error(400, f"invalid JSON: {e}")
+            return
+        if not isinstance(record, dict):
+            self._error(400, "expected a JSON object")
+            return
+
+        if not self.server.slots.acquire(blocking=False):
+            self._error(HTTPStatus.SERVICE_UNAVAILABLE, "render queue full")
+            return
+        metrics = self.server.metrics
+        metrics.render_started()
+        try:
+            filename, pdf = self.server.pool.submit(_render, record, self.server.default_logo, size).result()
+        except (ValueError, TypeError, FileNotFoundError) as e:
+            self._error(400, f"{type(e).__name__}: {e}")
+            return
+        except Exception as e:
+            log.exception("render failed")
+            self._error(500, f"{type(e).__name__}: {e}")
+            return
+        finally:
+            metrics.render_finished()
+            self.server.slots.release()
+
+        # output is deterministic: identical records give identical bytes and the same ETag
+        etag = f'"{pdf.sha256}"'
+        headers = {"ETag": etag, "X-Content-SHA256": pdf.sha256}
+        if etag in (self.headers.get("If-None-Match") or ""):
+            self._send(HTTPStatus.NOT_MODIFIED, b"", "application/pdf", headers)
+            return
+        headers["Content-Disposition"] = content_disposition(filename)
+        self._send(200, pdf.data, "application/pdf", headers)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Serve equipment issue PDFs over HTTP.")
+    ap.add_argument("--host", default="127.0.0.1", help="bind address (default: 127.0.0.1)")
+    ap.add_argument("--port", type=int, default=8502)
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="render processes (default: CPU count)")
+    ap.add_argument("--logo", default="demoforce_logo.png", help="logo file in assets/logos when a record names none")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    server = RenderServer((args.host, args.port), max(1, args.workers), args.logo)
+    log.info("listening on http://%s:%d (%d workers)", args.host, args.port, args.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
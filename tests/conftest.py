@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the app's top-level modules (server, batch) and namespace packages (pdf, ui) import from the project root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pdf.assets import LOGOS_DIR
+from pdf.generator import render_pdf
+from pdf.model import EquipmentIssueForm
+
+ROOT = Path(__file__).resolve().parents[1]
+STATE = {
+    "name": "José García-López", "date": "2026-01-05", "work_location": "Leeds",
+    "issuer_name": "IT Desk", "receiver_name": "José García-López",
+    "eq_desc_0": "Laptop", "eq_condition_0": "New", "eq_serial_0": "SN1", "eq_asset_0": "AST-1",
+    "laptop_username": "jose.garcialopez", "laptop_password": "Secret-1",
+    "m365_username": "jose.garcialopez@statom.co.uk", "m365_password": "Secret-2", "m365_2fa": True,
+    "extra_accounts": [{"Software": "Sage", "Account": "jgl", "Password": "Secret-3"}],
+}
+LOGO = str(LOGOS_DIR / "statom_logo.png")
+
+_RENDER_IN_CHILD = """
+import json, sys
+from pdf.generator import render_pdf
+from pdf.model import EquipmentIssueForm
+state, logo, size = json.loads(sys.stdin.read())
+sys.stdout.write(render_pdf(EquipmentIssueForm.from_state(state, logo_path=logo), size).sha256)
+"""
+
+
+def _form(state=STATE):
+    return EquipmentIssueForm.from_state(state, logo_path=LOGO)
+
+
+@pytest.mark.parametrize("size", ["print", "archive"])
+def test_render_is_byte_for_byte_repeatable(size):
+    first, second = render_pdf(_form(), size), render_pdf(_form(), size)
+
+    assert first.data == second.data
+    assert first.sha256 == second.sha256 == hashlib.sha256(first.data).hexdigest()
+
+    # a fresh interpreter: no warm caches, a different hash seed
+    child = subprocess.run(
+        [sys.executable, "-c", _RENDER_IN_CHILD],
+        input=json.dumps([STATE, LOGO, size]), capture_output=True, text=True, check=True, cwd=ROOT,
+        env={**os.environ, "PYTHONHASHSEED": "12345", "PYTHONPATH": str(ROOT)},
+    )
+    assert child.stdout == first.sha256
+
+
+def test_one_field_changes_the_hash():
+    edited = dict(STATE, eq_serial_0="SN2")
+
+    assert render_pdf(_form(edited)).sha256 != render_pdf(_form()).sha256
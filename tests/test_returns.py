@@ -0,0 +1,84 @@
+import dataclasses
+from io import BytesIO
+
+import pytest
+from pypdf import PdfReader
+
+from pdf.generator import render_equipment_issue_pdf
+from pdf.model import EquipmentIssueForm, EquipmentRow, Personnel
+from pdf.returns import RETURN_MARK, append_return, issue_revision
+
+PERSON = Personnel(name="Jack Smith", date="2026-01-05", work_location="Leeds", issuer_name="IT", receiver_name="Jack Smith")
+ISSUED = EquipmentIssueForm(personnel=PERSON, equipment=(EquipmentRow("Laptop", "New", "SN1", "AST-1"),))
+
+
+def _returned(*descriptions):
+    return EquipmentIssueForm(
+        personnel=PERSON,
+        equipment=ISSUED.equipment,
+        returned=tuple(EquipmentRow(d, "Good", "SN1", "AST-1") for d in descriptions),
+    )
+
+
+@pytest.fixture(scope="module")
+def issued():
+    return render_equipment_issue_pdf(ISSUED, invariant=True)
+
+
+def _page_texts(pdf: bytes):
+    return [p.extract_text() for p in PdfReader(BytesIO(pdf)).pages]
+
+
+def test_return_appends_to_issue_revision(issued):
+    updated = append_return(issued, _returned("Laptop back"))
+
+    assert updated.startswith(issued)
+    assert "Laptop back" in _page_texts(updated)[0]
+    assert issue_revision(updated) == issued
+
+
+def test_second_return_replaces_the_first(issued):
+    first = append_return(issued, _returned(*(f"First item {i}" for i in range(12))))
+    second = append_return(first, _returned("Second item"))
+
+    assert second.startswith(issued)
+    texts = _page_texts(second)
+    assert len(texts) == len(_page_texts(issued))     # the first return's continuation pages are gone
+    assert "Second item" in texts[0]
+    assert "First item" not in "".join(texts)
+    assert append_return(second, _returned("Second item")) == second
+
+
+def test_unreadable_pdf_is_a_value_error():
+    with pytest.raises(ValueError, match="not a readable PDF"):
+        append_return(b"%PDF-1.4\nnot really a pdf", _returned("Laptop"))
+
+
+def test_damaged_return_revision_is_a_value_error(issued):
+    updated = append_return(issued, _returned("Laptop back"))
+    mark = f"{RETURN_MARK} {len(issued)}".encode()
+    damaged = updated.replace(mark, f"{RETURN_MARK} {len(issued) - 7}".encode())
+    assert damaged != updated
+
+    with pytest.raises(ValueError, match="damaged"):
+        append_return(damaged, _returned("Laptop"))
+
+
+def test_return_hides_issue_time_return_values():
+    pymupdf = pytest.importorskip("pymupdf")
+
+    def page1(pdf):
+        return pymupdf.open(stream=pdf).load_page(0).get_pixmap(dpi=100).samples
+
+    person = dataclasses.replace(PERSON, return_issuer="IT Desk", return_receiver="Jack Smith")
+    at_issue = dataclasses.replace(ISSUED, personnel=person, returned=(EquipmentRow("Old mouse", "Worn", "SN9", "AST-9"),))
+    at_return = dataclasses.replace(
+        ISSUED,
+        personnel=dataclasses.replace(person, return_issuer="Bob Admin", return_receiver="Mary Jones"),
+        returned=(EquipmentRow("Laptop", "Good", "SN1", "AST-1"),),
+    )
+
+    updated = append_return(render_equipment_issue_pdf(at_issue, invariant=True), at_return)
+
+    # page 1 looks exactly as if the form had been issued with the return values
+    assert page1(updated) == page1(render_equipment_issue_pdf(at_return, invariant=True))
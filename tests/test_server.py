@@ -0,0 +1,74 @@
+import http.client
+import json
+import threading
+from urllib.parse import quote
+
+import pytest
+
+from server import RenderServer, content_disposition
+
+
+@pytest.fixture(scope="module")
+def server():
+    srv = RenderServer(("127.0.0.1", 0), workers=1, default_logo="")
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _post(server, body: bytes, headers=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        conn.request("POST", "/render", body=body, headers=headers or {})
+        resp = conn.getresponse()
+        return resp, resp.read()
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("name", ["Łukasz Żółć", "Ольга Иванова"])
+def test_render_non_latin1_name(server, name):
+    resp, body = _post(server, json.dumps({"name": name, "eq_asset_0": "A1"}).encode("utf-8"))
+
+    assert resp.status == 200
+    assert body.startswith(b"%PDF")
+    disposition = resp.getheader("Content-Disposition")
+    assert f"filename*=UTF-8''{quote(f'{name} - A1.pdf', safe='')}" in disposition
+
+
+def test_content_disposition_ascii_fallback():
+    header = content_disposition("Ольга Иванова - A1.pdf")
+    header.encode("latin-1")
+    assert 'filename="Olga Ivanova - A1.pdf"' in header
+    assert 'filename="form.pdf"' in content_disposition("中文.pdf")
+
+
+@pytest.mark.parametrize("length", ["-1", "abc"])
+def test_bad_content_length(server, length):
+    resp, body = _post(server, b"{}", {"Content-Length": length})
+
+    assert resp.status == 400
+    assert json.loads(body) == {"error": "bad Content-Length"}
+
+
+@pytest.mark.parametrize("logo", ["../../etc/passwd.png", "/etc/passwd", "sub/../../x.png"])
+def test_logo_outside_logos_dir(server, logo):
+    resp, body = _post(server, json.dumps({"name": "Jack Smith", "logo": logo}).encode("utf-8"))
+
+    assert resp.status == 400
+    assert "assets/logos" in json.loads(body)["error"]
+
+
+@pytest.mark.parametrize("record", [
+    {"name": "Jack Smith", "extra_accounts": [1, 2]},
+    {"name": "Jack Smith", "extra_accounts": "{not json"},
+    {"name": "Jack Smith", "equipment": "x"},
+    {"name": "Jack Smith", "returned_equipment": [["Laptop"]]},
+])
+def test_malformed_nested_record(server, record):
+    resp, body = _post(server, json.dumps(record).encode("utf-8"))
+
+    assert resp.status == 400
+    assert "error" in json.loads(body)
@@ -0,0 +1,43 @@
+import dataclasses
+import sqlite3
+
+from pdf.model import EquipmentIssueForm, EquipmentRow, Personnel
+from pdf.store import FormStore
+
+PERSON = Personnel(name="Jack Smith", date="2026-01-05", work_location="Leeds", issuer_name="IT", receiver_name="Jack Smith")
+FORM = EquipmentIssueForm(personnel=PERSON, equipment=(EquipmentRow("Laptop", "New", "SN1", "AST-1"),))
+
+
+def test_edited_re_export_replaces_the_stored_form(tmp_path):
+    store = FormStore(tmp_path / "forms.sqlite3")
+    form_id = store.save(FORM)
+    assert store.save(FORM) is None
+
+    edited = dataclasses.replace(FORM, equipment=(EquipmentRow("Laptop", "New", "SN2", "AST-2"),))
+    assert store.save(edited) == form_id
+
+    assert store.find_by_asset("AST-1") == []
+    assert [r["serial"] for r in store.find_by_asset("AST-2")] == ["SN2"]
+    assert len(store.find_by_person("Jack Smith")) == 1
+
+
+def test_old_database_keeps_the_newest_export(tmp_path):
+    path = tmp_path / "forms.sqlite3"
+    FormStore(path)
+    with sqlite3.connect(path) as conn:      # a database from before form_key
+        conn.execute("DROP INDEX ix_personnel_form_key")
+        conn.execute("ALTER TABLE personnel DROP COLUMN form_key")
+        for i, asset in enumerate(("AST-1", "AST-2")):
+            conn.execute(
+                "INSERT INTO personnel (id, form_hash, name, issue_date, work_location, issuer_name, receiver_name,"
+                " return_issuer, return_receiver, logo, exported_at) VALUES (?, ?, 'Jack Smith', '2026-01-05',"
+                " '', '', 'Jack Smith', '', '', '', '')",
+                (i + 1, f"h{i}"),
+            )
+            conn.execute("INSERT INTO issued_equipment VALUES (?, 0, 'Laptop', '', '', ?)", (i + 1, asset))
+    conn.close()
+
+    store = FormStore(path)
+
+    assert store.find_by_asset("AST-1") == []
+    assert [r["form_id"] for r in store.find_by_asset("AST-2")] == [2]
@@ -0,0 +1,78 @@
+"""
+Process-wide registry of the UI's static assets: the stylesheet and the
+logo preview thumbnails.
+
+Everything is loaded on first use and re-checked by mtime (one stat per file)
+on each rerun, instead of re-reading and re-decoding. Nothing is decoded at
+import or startup, so a cold start only pays for the logo it shows.
+"""
+import threading
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from pdf.assets import LOGOS_DIR, get_logo
+
+CSS_PATH = Path(__file__).resolve().parent / "styles.css"
+THUMB_WIDTH = 400   # px; shown at 200 CSS px, so it stays sharp on high-DPI screens
+
+
+class LogoEntry(NamedTuple):
+    name: str
+    path: str           # resolved
+    mtime_ns: int
+    thumbnail: bytes    # PNG, THUMB_WIDTH wide
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _thumbnail(path: str) -> bytes:
+    from PIL import Image
+
+    img = get_logo(path).image
+    if img.width > THUMB_WIDTH:
+        img = img.resize((THUMB_WIDTH, max(1, round(img.height * THUMB_WIDTH / img.width))), Image.LANCZOS)
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class AssetRegistry:
+    def __init__(self, css_path: Path = CSS_PATH, logos_dir: Path = LOGOS_DIR):
+        self.css_path = css_path
+        self.logos_dir = logos_dir
+        self._lock = threading.Lock()
+        self._css: Tuple[Optional[int], str] = (None, "")
+        self._logos: Dict[str, LogoEntry] = {}
+
+    def css(self) -> str:
+        """Stylesheet text ("" when the file is missing)."""
+        mtime = _mtime_ns(self.css_path)
+        with self._lock:
+            if mtime != self._css[0]:
+                text = self.css_path.read_text(encoding="utf-8") if mtime is not None else ""
+                self._css = (mtime, text)
+            return self._css[1]
+
+    def logo(self, name: str) -> LogoEntry:
+        """Catalog entry with a precomputed thumbnail; rebuilt when the file changes. Raises OSError."""
+        path = self.logos_dir / name
+        mtime = path.stat().st_mtime_ns
+        with self._lock:
+            entry = self._logos.get(name)
+            if entry is not None and entry.mtime_ns == mtime:
+                return entry
+        # decode outside the lock; a duplicate build on a race is harmless
+        resolved = str(path.resolve())
+        entry = LogoEntry(name=name, path=resolved, mtime_ns=mtime, thumbnail=_thumbnail(resolved))
+        with self._lock:
+            self._logos[name] = entry
+        return entry
+
+
+registry = AssetRegistry()
@@ -0,0 +1,63 @@
+import streamlit as st
+
+from pdf.companies import get_companies
+from pdf.model import DEFAULT_HELPDESK_EMAIL, DEFAULT_M365_DOMAIN, DEFAULT_SHAREPOINT_URL
+
+
+def sync_m365_username():
+    """Keep the derived "user@domain" in step with the username base and the selected domain."""
+    base = str(st.session_state.get("m365_user_base") or "").strip()
+    domain = str(st.session_state.get("m365_domain") or "").strip() or DEFAULT_M365_DOMAIN
+    st.session_state["m365_username"] = f"{base}@{domain}" if base else ""
+
+
+def _apply_company(overwrite: bool):
+    bundle = get_companies().get(st.session_state.get("company"))
+    if bundle is not None:
+        values = bundle.defaults()
+    else:
+        # no profiles configured: the model's fallbacks
+        values = {"m365_domain": DEFAULT_M365_DOMAIN, "sharepoint_url": DEFAULT_SHAREPOINT_URL, "helpdesk_email": DEFAULT_HELPDESK_EMAIL}
+
+    changed = False
+    for key, value in values.items():
+        if overwrite or key not in st.session_state:
+            st.session_state[key] = value
+            changed = True
+    if changed:
+        sync_m365_username()
+
+
+def render_company_picker():
+    """
+    Company selectbox. Picking one copies its logo, M365 domain, SharePoint URL
+    and helpdesk email into the form (a lookup in the compiled profiles).
+    """
+    companies = get_companies()
+    if not len(companies):
+        _apply_company(overwrite=False)
+        return None
+
+    if st.session_state.get("company") not in companies.bundles:
+        st.session_state["company"] = companies.default
+
+    st.selectbox(
+        "Company",
+        companies.keys(),
+        format_func=lambda k: companies.bundles[k].name,
+        key="company",
+        on_change=_apply_company,
+        args=(True,),
+    )
+    # first run (or a restored session): fill whatever isn't set yet
+    _apply_company(overwrite=False)
+    return companies.get(st.session_state["company"])
+
+
+def m365_domains() -> list:
+    """Domain choices for the passwords form: every company's, plus any domain already in state."""
+    domains = get_companies().domains() or [DEFAULT_M365_DOMAIN]
+    current = st.session_state.get("m365_domain")
+    if current and current not in domains:
+        domains.append(current)
+    return domains
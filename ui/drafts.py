@@ -0,0 +1,55 @@
+import streamlit as st
+
+from pdf.drafts import SECRET_KEYS, decode_fields, draft_fields, get_draft_writer, new_draft_id, valid_draft_id
+
+_MISSING = object()
+
+
+def _start(draft_id: str, fields: dict):
+    st.session_state["_draft_id"] = draft_id
+    st.session_state["_draft_saved"] = fields
+    st.query_params["draft"] = draft_id
+
+
+def restore_draft():
+    """
+    Once per session, before any widget renders: restore the draft named in the
+    URL (?draft=...) in one pass, or start a new one. A reload, or a server
+    restart, keeps the URL and so comes back to the same form.
+    """
+    if "_draft_id" in st.session_state:
+        return
+
+    draft_id = st.query_params.get("draft")
+    fields = get_draft_writer().load(draft_id) if valid_draft_id(draft_id) else None
+    if fields is None:
+        draft_id, fields = new_draft_id(), {}
+    st.session_state.update(decode_fields(fields))
+    _start(draft_id, fields)
+
+
+def autosave():
+    """Queue the fields changed since the last call (cheap when nothing changed; the write itself is debounced)."""
+    draft_id = st.session_state.get("_draft_id")
+    if draft_id is None:
+        return
+
+    saved = st.session_state["_draft_saved"]
+    current = draft_fields(st.session_state)
+    changes = {k: v for k, v in current.items() if saved.get(k, _MISSING) != v}
+    deleted = [k for k in saved if k not in current]
+    if changes or deleted:
+        get_draft_writer().submit(draft_id, changes, deleted)
+        st.session_state["_draft_saved"] = current
+
+
+def _new_form():
+    get_draft_writer().discard(st.session_state["_draft_id"])
+    for k in set(draft_fields(st.session_state)) | SECRET_KEYS | {"extra_accounts_editor", "_extra_accounts_base", "_return_pdf"}:
+        st.session_state.pop(k, None)
+    _start(new_draft_id(), {})
+
+
+def render_draft_controls():
+    st.caption("Changes are saved as a draft; reloading this page restores them (passwords excepted).")
+    st.button("Start a new form", key="new_form", on_click=_new_form)
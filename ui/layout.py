@@ -1,17 +1,14 @@
 import streamlit as st
-import re
 
+from pdf.inventory import get_inventory
+from pdf.model import EquipmentIssueForm, row_counts
+from pdf.usernames import username
+from ui.company import sync_m365_username
+from ui.pdf_export import refresh_live_form
 
-def _name_to_username(full_name: str) -> str:
-    # "Jack Smith" -> "jack.smith"
-    s = (full_name or "").strip().lower()
-    s = re.sub(r"[^a-z0-9 ]+", "", s)  # keep letters/numbers/spaces only
-    parts = [p for p in s.split() if p]
-    if not parts:
-        return ""
-    if len(parts) == 1:
-        return parts[0]
-    return f"{parts[0]}.{parts[-1]}"
+# rows shown before anything is added; more appear via "Add row"
+_START_ROWS = {"eq": 3, "ret": 1}
+_ROW_FIELDS = ("desc", "condition", "serial", "asset")
 
 
 def _sync_from_name():
@@ -29,7 +26,7 @@ def _sync_from_name():
     if not full_name:
         return
 
-    username = _name_to_username(full_name)
+    user = username(full_name)
 
     # keep receiver name synced
     st.session_state["receiver_name"] = full_name
@@ -41,30 +38,140 @@ def _sync_from_name():
     st.session_state["return_receiver"] = full_name
 
     # laptop and domain usernames
-    st.session_state["laptop_username"] = username
-    st.session_state["domain_username"] = username
+    st.session_state["laptop_username"] = user
+    st.session_state["domain_username"] = user
 
-    # m365 username/base
-    st.session_state["m365_user_base"] = username
-    domain = st.session_state.get("email_domain", "statom.co.uk")
-    st.session_state["m365_username"] = f"{username}@{domain}" if username else ""
+    # m365 username/base (domain from the selected company / domain picker)
+    st.session_state["m365_user_base"] = user
+    sync_m365_username()
 
 
-def render_form():
-    st.markdown(
-        """
-        <style>
-        .form-wrapper {
-            transform: scale(0.9);
-            transform-origin: top left;
-            max-width: 1000px;
-            margin: auto;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
+def _fill_from_inventory(i: int, field: str):
+    """
+    Asset/serial on_change: when the value matches the inventory exactly,
+    fill in the other columns of that equipment row (without overwriting typed values).
+    """
+    inv = get_inventory()
+    if inv is None:
+        return
+
+    value = st.session_state.get(f"eq_{field}_{i}", "")
+    item = inv.lookup_asset(value) if field == "asset" else inv.lookup_serial(value)
+    if item is None:
+        return
+
+    # normalise the typed value to the inventory's spelling
+    st.session_state[f"eq_{field}_{i}"] = getattr(item, field)
+
+    for key, v in ((f"eq_asset_{i}", item.asset), (f"eq_serial_{i}", item.serial), (f"eq_desc_{i}", item.description)):
+        if v and not (st.session_state.get(key) or "").strip():
+            st.session_state[key] = v
+
+
+def _inventory_hint(inv, i: int):
+    # typed asset/serial that isn't in the inventory -> show the closest prefix matches
+    for field, lookup, suggest in (
+        ("asset", inv.lookup_asset, inv.suggest_assets),
+        ("serial", inv.lookup_serial, inv.suggest_serials),
+    ):
+        value = (st.session_state.get(f"eq_{field}_{i}") or "").strip()
+        if not value or lookup(value) is not None:
+            continue
+        matches = suggest(value, limit=5)
+        if matches:
+            keys = ", ".join(getattr(m, field) for m in matches)
+            st.caption(f"Inventory {field} matches: {keys}")
+        else:
+            st.caption(f"⚠️ {field} '{value}' not in inventory")
+
+
+def _row_count(prefix: str) -> int:
+    """Rows currently shown for "eq" / "ret"; starts from any rows already in state (e.g. a restored form)."""
+    key = f"{prefix}_row_count"
+    if key not in st.session_state:
+        in_state = row_counts(st.session_state)[0 if prefix == "eq" else 1]
+        st.session_state[key] = max(in_state, _START_ROWS[prefix])
+    return st.session_state[key]
+
+
+def _add_row(prefix: str):
+    st.session_state[f"{prefix}_row_count"] = _row_count(prefix) + 1
+
+
+def _remove_row(prefix: str):
+    n = _row_count(prefix)
+    if n <= 1:
+        return
+    # drop the row's values too, so the PDF and the checklist forget it
+    for f in _ROW_FIELDS:
+        st.session_state.pop(f"{prefix}_{f}_{n - 1}", None)
+    st.session_state[f"{prefix}_row_count"] = n - 1
+
+
+def _row_buttons(prefix: str):
+    col_add, col_remove, _ = st.columns([1, 1, 4])
+    with col_add:
+        st.button("Add row", key=f"{prefix}_add_row", on_click=_add_row, args=(prefix,))
+    with col_remove:
+        st.button(
+            "Remove last row", key=f"{prefix}_remove_row", on_click=_remove_row, args=(prefix,),
+            disabled=_row_count(prefix) <= 1,
+        )
+
+
+def equipment_summary(form: EquipmentIssueForm):
+    """(any description filled, first asset number): what the checklist and export filename need."""
+    return any(r.description for r in form.equipment), form.first_asset_number()
+
+
+@st.fragment
+def _render_equipment_table():
+    # Edits here rerun only this fragment. The full app reruns only when the
+    # checklist / export filename would change.
+    # The widget keys (eq_desc_0, ...) are the only copy of the cells; the
+    # checklist, export filename and PDF record all read them from there.
+    n = _row_count("eq")
+    inventory = get_inventory()
+
+    for i in range(n):
+        col_a, col_b, col_c, col_d = st.columns([3, 2, 2, 2])
+        with col_a:
+            st.text_input("Description", key=f"eq_desc_{i}")
+        with col_b:
+            st.text_input("Condition at Issue", key=f"eq_condition_{i}")
+        with col_c:
+            st.text_input("Serial No", key=f"eq_serial_{i}", on_change=_fill_from_inventory, args=(i, "serial"))
+        with col_d:
+            st.text_input("Asset No", key=f"eq_asset_{i}", on_change=_fill_from_inventory, args=(i, "asset"))
+        if inventory is not None:
+            _inventory_hint(inventory, i)
+
+    _row_buttons("eq")
+
+    form = refresh_live_form()
+    if equipment_summary(form) != st.session_state.get("_equipment_summary_shown"):
+        st.rerun()
+
+
+@st.fragment
+def _render_returned_table():
+    for i in range(_row_count("ret")):
+        col_a, col_b, col_c, col_d = st.columns([3, 2, 2, 2])
+        with col_a:
+            st.text_input("Description", key=f"ret_desc_{i}")
+        with col_b:
+            st.text_input("Returned Condition", key=f"ret_condition_{i}")
+        with col_c:
+            st.text_input("Serial No", key=f"ret_serial_{i}")
+        with col_d:
+            st.text_input("Asset No", key=f"ret_asset_{i}")
+
+    _row_buttons("ret")
 
+    refresh_live_form()
+
+
+def render_form():
     st.markdown('<div class="form-wrapper">', unsafe_allow_html=True)
 
     # Header meta
@@ -122,30 +229,16 @@ def render_form():
         st.date_input("Date", key="date", label_visibility="collapsed")
 
     st.markdown('<div class="label">WORK LOCATION:</div>', unsafe_allow_html=True)
-    st.text_input("Work Location", key="work_location", value="Roaming", label_visibility="collapsed")
+    # seeded through state rather than value=, so a restored draft or a form loaded for return can set it
+    st.session_state.setdefault("work_location", "Roaming")
+    st.text_input("Work Location", key="work_location", label_visibility="collapsed")
 
     # ---------------------------
     # Equipment table
     # ---------------------------
     st.markdown('<div class="section-yellow">EQUIPMENT</div>', unsafe_allow_html=True)
 
-    if "equipment" not in st.session_state:
-        st.session_state["equipment"] = [{} for _ in range(10)]
-
-    equipment_data = st.session_state["equipment"]
-
-    for i in range(10):
-        col_a, col_b, col_c, col_d = st.columns([3, 2, 2, 2])
-        with col_a:
-            equipment_data[i]["DESCRIPTION"] = st.text_input("Description", key=f"eq_desc_{i}")
-        with col_b:
-            equipment_data[i]["CONDITION AT ISSUE"] = st.text_input("Condition at Issue", key=f"eq_condition_{i}")
-        with col_c:
-            equipment_data[i]["SERIAL No"] = st.text_input("Serial No", key=f"eq_serial_{i}")
-        with col_d:
-            equipment_data[i]["ASSET No"] = st.text_input("Asset No", key=f"eq_asset_{i}")
-
-    st.session_state["equipment"] = equipment_data
+    _render_equipment_table()
 
     # ---------------------------
     # Issue signoff
@@ -172,23 +265,7 @@ def render_form():
     # ---------------------------
     st.markdown('<div class="section-blue">RETURNED EQUIPMENT</div>', unsafe_allow_html=True)
 
-    if "returned_equipment" not in st.session_state:
-        st.session_state["returned_equipment"] = [{} for _ in range(8)]
-
-    returned_data = st.session_state["returned_equipment"]
-
-    for i in range(8):
-        col_a, col_b, col_c, col_d = st.columns([3, 2, 2, 2])
-        with col_a:
-            returned_data[i]["DESCRIPTION"] = st.text_input("Description", key=f"ret_desc_{i}")
-        with col_b:
-            returned_data[i]["RETURNED CONDITION"] = st.text_input("Returned Condition", key=f"ret_condition_{i}")
-        with col_c:
-            returned_data[i]["SERIAL No"] = st.text_input("Serial No", key=f"ret_serial_{i}")
-        with col_d:
-            returned_data[i]["ASSET No"] = st.text_input("Asset No", key=f"ret_asset_{i}")
-
-    st.session_state["returned_equipment"] = returned_data
+    _render_returned_table()
 
     # ---------------------------
     # Return signoff
@@ -1,6 +1,29 @@
 import streamlit as st
-import pandas as pd
 
+from ui.company import m365_domains, sync_m365_username
+from ui.pdf_export import refresh_live_form
+
+
+_EXTRA_COLUMNS = ("Software", "Account", "Password")
+
+
+def _apply_extra_edits():
+    """
+    data_editor on_change: apply the editor's delta to the rows it was given, in
+    the order Streamlit does (cell edits, deletions, additions). `extra_accounts`
+    is only rebuilt here, not converted from a DataFrame on every rerun.
+    """
+    delta = st.session_state["extra_accounts_editor"]
+    rows = [dict(r) for r in st.session_state["_extra_accounts_base"]]
+    for pos, changes in (delta.get("edited_rows") or {}).items():
+        rows[int(pos)].update(changes)
+    for pos in sorted((int(p) for p in delta.get("deleted_rows") or ()), reverse=True):
+        del rows[pos]
+    rows += delta.get("added_rows") or []
+    st.session_state["extra_accounts"] = [{c: r.get(c) or "" for c in _EXTRA_COLUMNS} for r in rows]
+
+
+@st.fragment
 def render_passwords_form():
     st.markdown("## Passwords (Page 2)")
 
@@ -10,12 +33,14 @@ def render_passwords_form():
     st.text_input("New Starter Full Name", key="starter_full_name")
     st.text_input("Job Title", key="starter_role")
 
-    st.text_area(
-        "Instructions (shown on PDF)",
-        key="starter_instructions",
-        value='Please download the “Microsoft Authenticator App” from your Play Store or App Store',
-        height=80,
+    # defaults seeded through state rather than value=, so a restored draft can set them
+    st.session_state.setdefault(
+        "starter_instructions",
+        'Please download the “Microsoft Authenticator App” from your Play Store or App Store',
     )
+    st.session_state.setdefault("m365_2fa", True)
+
+    st.text_area("Instructions (shown on PDF)", key="starter_instructions", height=80)
 
     # ----------------------------
     # Account details
@@ -36,19 +61,22 @@ def render_passwords_form():
             "Microsoft 365 username (without @domain)",
             key="m365_user_base",
             help="Example: dalif.toro",
+            on_change=sync_m365_username,
         )
         st.selectbox(
             "Microsoft 365 domain",
-            ["statom.co.uk", "demoforce.co.uk", "st-mep.co.uk", "frankifoundations.co.uk", "apexcoreengineering.co.uk"],
+            m365_domains(),
             key="m365_domain",
+            on_change=sync_m365_username,
         )
         st.text_input("Microsoft 365 password", key="m365_password", type="password")
-        st.checkbox("2 Factor Authentication setup required", key="m365_2fa", value=True)
+        st.checkbox("2 Factor Authentication setup required", key="m365_2fa")
 
     with col2:
         st.subheader("Useful Info")
-        st.text_input("SharePoint URL", key="sharepoint_url", value="https://statom.sharepoint.com")
-        st.text_input("IT Support Helpdesk Email", key="helpdesk_email", value="helpdesk@statom.co.uk")
+        # defaults come from the selected company profile
+        st.text_input("SharePoint URL", key="sharepoint_url")
+        st.text_input("IT Support Helpdesk Email", key="helpdesk_email")
 
     # ----------------------------
     # Extra accounts (AutoCAD etc.)
@@ -57,24 +85,20 @@ def render_passwords_form():
     st.caption("Add rows for anything extra (AutoCAD, Revit, Dropbox, etc).")
 
     if "extra_accounts" not in st.session_state:
-        st.session_state["extra_accounts"] = [{"Software": "", "Account": "", "Password": ""}]
-
-    df = pd.DataFrame(st.session_state["extra_accounts"])
+        st.session_state["extra_accounts"] = [dict.fromkeys(_EXTRA_COLUMNS, "")]
+    # the editor always gets the rows it started with; its own state holds the edits since
+    if "_extra_accounts_base" not in st.session_state:
+        st.session_state["_extra_accounts_base"] = list(st.session_state["extra_accounts"])
 
-    edited = st.data_editor(
-        df,
+    st.data_editor(
+        st.session_state["_extra_accounts_base"],
         num_rows="dynamic",
         use_container_width=True,
         key="extra_accounts_editor",
-        column_config={
-            "Software": st.column_config.TextColumn("Software"),
-            "Account": st.column_config.TextColumn("Account"),
-            "Password": st.column_config.TextColumn("Password"),
-        },
+        on_change=_apply_extra_edits,
+        column_config={c: st.column_config.TextColumn(c) for c in _EXTRA_COLUMNS},
     )
 
-    st.session_state["extra_accounts"] = edited.fillna("").to_dict("records")
-
     # ----------------------------
     # Optional: show the final M365 email on-screen
     # ----------------------------
@@ -82,3 +106,5 @@ def render_passwords_form():
     dom = (st.session_state.get("m365_domain") or "").strip()
     if base and dom:
         st.info(f"Microsoft 365 email will be: {base}@{dom}")
+
+    refresh_live_form()
@@ -0,0 +1,124 @@
+import re
+from datetime import date
+
+import streamlit as st
+
+from pdf.model import EquipmentIssueForm
+from pdf.store import get_writer
+
+_ROW_KEY = re.compile(r"^(eq|ret)_(?:desc|condition|serial|asset)_\d+$")
+
+
+def _store():
+    # the process-wide writer's store: lookups open their own connection
+    return get_writer().store
+
+
+def _load_for_return(form_id: int):
+    """on_click: replace the form in session state with a stored one, returned rows prefilled from the issued ones."""
+    form = _store().load(form_id)
+    p = form.personnel
+
+    for k in [k for k in st.session_state if isinstance(k, str) and _ROW_KEY.match(k)]:
+        del st.session_state[k]
+
+    st.session_state.update(
+        name=p.name,
+        date=date.fromisoformat(p.date) if p.date else None,
+        work_location=p.work_location,
+        issuer_name=p.issuer_name,
+        receiver_name=p.receiver_name,
+        return_issuer=p.return_issuer,
+        return_receiver=p.return_receiver or p.receiver_name,
+    )
+    for prefix, rows in (("eq", form.equipment), ("ret", form.returned)):
+        for i, r in enumerate(rows):
+            st.session_state[f"{prefix}_desc_{i}"] = r.description
+            st.session_state[f"{prefix}_condition_{i}"] = r.condition
+            st.session_state[f"{prefix}_serial_{i}"] = r.serial
+            st.session_state[f"{prefix}_asset_{i}"] = r.asset
+        st.session_state[f"{prefix}_row_count"] = max(len(rows), 1)
+
+    st.session_state["_return_form_id"] = form_id
+
+
+def _return_pdf(issued_pdf: bytes, form: EquipmentIssueForm) -> bytes:
+    from pdf.returns import append_return  # pypdf, only once a return is exported
+
+    return append_return(issued_pdf, form)
+
+
+def _record_return(form_id: int, form: EquipmentIssueForm):
+    # download on_click: the file the user got is the return of record
+    _store().record_return(form_id, form)
+
+
+def _search():
+    col_by, col_value = st.columns([1, 2])
+    with col_by:
+        by = st.selectbox("Find by", ("Person", "ASSET No", "SERIAL No"), key="return_find_by")
+    with col_value:
+        value = st.text_input("Search", key="return_find_value").strip()
+    if not value:
+        return
+
+    store = _store()
+    finder = {"Person": store.find_by_person, "ASSET No": store.find_by_asset, "SERIAL No": store.find_by_serial}[by]
+    forms = {}  # form_id -> label, newest first
+    for r in finder(value):
+        if r["form_id"] not in forms:
+            forms[r["form_id"]] = f"{r['issue_date']} · {r['receiver_name'] or r['name']} · {r['work_location']}"
+    if not forms:
+        st.caption("No issued forms match.")
+        return
+
+    form_id = st.selectbox("Issued form", list(forms), format_func=forms.get, key="return_form_pick")
+    st.button("Load for return", key="return_load", on_click=_load_for_return, args=(form_id,))
+
+
+def render_returns():
+    """
+    Return leg of a stored form: load it (returned rows prefilled from the issued
+    ones), edit the returned rows and sign-off in the form, then download the
+    archived PDF with the return section appended as an incremental update.
+    """
+    with st.expander("Returns", expanded="_return_form_id" in st.session_state):
+        _search()
+
+        form_id = st.session_state.get("_return_form_id")
+        if form_id is None:
+            return
+
+        st.caption(f"Returning form #{form_id}. Fill in the returned rows and the return sign-off, then upload its issued PDF.")
+        uploaded = st.file_uploader("Issued PDF", type=["pdf"], key="return_issued_pdf")
+        if uploaded is None:
+            return
+
+        issued = uploaded.getvalue()
+        if not issued.startswith(b"%PDF"):
+            st.error(f"{uploaded.name} is not a PDF.")
+            return
+
+        # built here rather than in a download callable, so a bad upload is reported on the page;
+        # kept until the upload or the form changes
+        form = st.session_state["_live_form"].form
+        key = (uploaded.file_id, form)
+        cached = st.session_state.get("_return_pdf")
+        if cached is None or cached[0] != key:
+            try:
+                cached = (key, _return_pdf(issued, form))
+            except (ValueError, RuntimeError) as e:
+                st.session_state.pop("_return_pdf", None)
+                st.error(f"Can't add the return to {uploaded.name}: {e}")
+                return
+            st.session_state["_return_pdf"] = cached
+
+        st.download_button(
+            label="Export return PDF",
+            data=cached[1],
+            file_name=uploaded.name,
+            mime="application/pdf",
+            key="export_return_pdf",
+            on_click=_record_return,
+            args=(form_id, form),
+        )